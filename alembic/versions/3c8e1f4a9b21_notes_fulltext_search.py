@@ -0,0 +1,56 @@
+"""notes full-text search index
+
+Revision ID: 3c8e1f4a9b21
+Revises: 5ef6e0e52c70
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c8e1f4a9b21"
+down_revision: Union[str, None] = "5ef6e0e52c70"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    # the btree over (title, content) can't serve '%q%' lookups
+    op.execute("DROP INDEX IF EXISTS ix_notes_title_content")
+
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+            "title, content, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute("INSERT INTO notes_fts (rowid, title, content) SELECT id, title, content FROM notes")
+    elif dialect == "postgresql":
+        op.create_table(
+            "notes_fts",
+            sa.Column("note_id", sa.Integer(), primary_key=True, nullable=False),
+            sa.Column("document", postgresql.TSVECTOR(), nullable=False),
+            sa.ForeignKeyConstraint(["note_id"], ["notes.id"], ondelete="CASCADE"),
+        )
+        op.create_index("ix_notes_fts_document", "notes_fts", ["document"], postgresql_using="gin")
+        op.execute(
+            "INSERT INTO notes_fts (note_id, document) "
+            "SELECT id, setweight(to_tsvector('english', title), 'A') || "
+            "setweight(to_tsvector('english', content), 'B') FROM notes"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS notes_fts")
+    elif dialect == "postgresql":
+        op.drop_index("ix_notes_fts_document", table_name="notes_fts")
+        op.drop_table("notes_fts")
@@ -0,0 +1,35 @@
+"""keyset pagination indexes
+
+Revision ID: 7d2b5e8c4f10
+Revises: 3c8e1f4a9b21
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2b5e8c4f10"
+down_revision: Union[str, None] = "3c8e1f4a9b21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_notes_owner_id_updated_at", "notes", ["owner_id", "updated_at", "id"], unique=False)
+
+    # activity_logs is created by the app on startup; index it if it's already there
+    if sa.inspect(op.get_bind()).has_table("activity_logs"):
+        op.create_index("ix_activity_logs_note_id_timestamp", "activity_logs", ["note_id", "timestamp", "id"], unique=False)
+        op.create_index("ix_activity_logs_user_id_timestamp", "activity_logs", ["user_id", "timestamp", "id"], unique=False)
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("activity_logs"):
+        op.drop_index("ix_activity_logs_user_id_timestamp", table_name="activity_logs")
+        op.drop_index("ix_activity_logs_note_id_timestamp", table_name="activity_logs")
+
+    op.drop_index("ix_notes_owner_id_updated_at", table_name="notes")
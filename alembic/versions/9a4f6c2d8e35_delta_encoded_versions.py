@@ -0,0 +1,94 @@
+"""delta-encoded note versions
+
+Revision ID: 9a4f6c2d8e35
+Revises: 7d2b5e8c4f10
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.utils.delta import make_delta, apply_delta
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4f6c2d8e35"
+down_revision: Union[str, None] = "7d2b5e8c4f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+note_versions = sa.table(
+    "note_versions",
+    sa.column("id", sa.Integer),
+    sa.column("note_id", sa.Integer),
+    sa.column("version_number", sa.Integer),
+    sa.column("content_snapshot", sa.Text),
+    sa.column("content_delta", sa.Text),
+    sa.column("base_version", sa.Integer),
+)
+
+
+def _note_ids(bind):
+    return bind.execute(sa.select(note_versions.c.note_id).distinct()).scalars().all()
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("note_versions") as batch:
+        batch.add_column(sa.Column("content_delta", sa.Text(), nullable=True))
+        batch.add_column(sa.Column("base_version", sa.Integer(), nullable=True))
+        batch.alter_column("content_snapshot", existing_type=sa.Text(), nullable=True)
+
+    interval = settings.VERSION_KEYFRAME_INTERVAL
+    if interval <= 1:
+        return
+
+    # re-encode one note at a time so memory stays bounded by a single history
+    bind = op.get_bind()
+    for note_id in _note_ids(bind):
+        rows = bind.execute(
+            sa.select(note_versions.c.id, note_versions.c.version_number, note_versions.c.content_snapshot)
+            .where(note_versions.c.note_id == note_id)
+            .order_by(note_versions.c.version_number)
+        ).all()
+        keyframe = None
+        for row in rows:
+            if keyframe is not None and row.version_number - keyframe.version_number < interval:
+                delta = make_delta(keyframe.content_snapshot, row.content_snapshot)
+                if len(delta) < len(row.content_snapshot):
+                    bind.execute(
+                        note_versions.update()
+                        .where(note_versions.c.id == row.id)
+                        .values(content_snapshot=None, content_delta=delta, base_version=keyframe.version_number)
+                    )
+                    continue
+            keyframe = row
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for note_id in _note_ids(bind):
+        rows = bind.execute(
+            sa.select(
+                note_versions.c.id,
+                note_versions.c.version_number,
+                note_versions.c.content_snapshot,
+                note_versions.c.content_delta,
+                note_versions.c.base_version,
+            ).where(note_versions.c.note_id == note_id)
+        ).all()
+        keyframes = {r.version_number: r.content_snapshot for r in rows if r.content_delta is None}
+        for row in rows:
+            if row.content_delta is not None:
+                bind.execute(
+                    note_versions.update()
+                    .where(note_versions.c.id == row.id)
+                    .values(content_snapshot=apply_delta(keyframes[row.base_version], row.content_delta))
+                )
+
+    with op.batch_alter_table("note_versions") as batch:
+        batch.alter_column("content_snapshot", existing_type=sa.Text(), nullable=False)
+        batch.drop_column("base_version")
+        batch.drop_column("content_delta")
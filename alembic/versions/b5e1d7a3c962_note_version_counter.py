@@ -0,0 +1,38 @@
+"""note version counter
+
+Revision ID: b5e1d7a3c962
+Revises: 9a4f6c2d8e35
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e1d7a3c962"
+down_revision: Union[str, None] = "9a4f6c2d8e35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+notes = sa.table("notes", sa.column("id", sa.Integer), sa.column("current_version", sa.Integer))
+note_versions = sa.table("note_versions", sa.column("note_id", sa.Integer), sa.column("version_number", sa.Integer))
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("notes") as batch:
+        batch.add_column(sa.Column("current_version", sa.Integer(), nullable=False, server_default="0"))
+
+    latest = (
+        sa.select(sa.func.max(note_versions.c.version_number))
+        .where(note_versions.c.note_id == notes.c.id)
+        .scalar_subquery()
+    )
+    op.execute(notes.update().values(current_version=sa.func.coalesce(latest, 0)))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("notes") as batch:
+        batch.drop_column("current_version")
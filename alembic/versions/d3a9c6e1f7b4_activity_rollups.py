@@ -0,0 +1,64 @@
+"""activity rollups
+
+Revision ID: d3a9c6e1f7b4
+Revises: b5e1d7a3c962
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a9c6e1f7b4"
+down_revision: Union[str, None] = "b5e1d7a3c962"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIONS = ("CREATE", "VIEW", "UPDATE", "DELETE", "SHARE", "UNSHARE", "RESTORE")
+# the type already exists: activity_logs uses it
+action_type = sa.Enum(*ACTIONS, name="actiontype").with_variant(
+    postgresql.ENUM(*ACTIONS, name="actiontype", create_type=False), "postgresql"
+)
+
+
+def upgrade() -> None:
+    # activity_logs is created by the app on startup, and so is this table when it isn't there yet
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("activity_logs"):
+        return
+    op.create_table(
+        "activity_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("note_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("action", action_type, nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["note_id"], ["notes.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("note_id", "day", "user_id", "action", name="uq_activity_rollups_key"),
+    )
+    op.create_index(op.f("ix_activity_rollups_user_id"), "activity_rollups", ["user_id"], unique=False)
+
+    # backfill from the raw log, for notes that still exist
+    day = "date(a.timestamp)" if bind.dialect.name == "sqlite" else "CAST(a.timestamp AS DATE)"
+    op.execute(
+        f"""
+        INSERT INTO activity_rollups (note_id, user_id, day, action, count)
+        SELECT a.note_id, a.user_id, {day}, a.action, COUNT(*)
+        FROM activity_logs a JOIN notes n ON n.id = a.note_id
+        WHERE a.action <> 'DELETE'
+        GROUP BY a.note_id, a.user_id, {day}, a.action
+        """
+    )
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("activity_rollups"):
+        op.drop_index(op.f("ix_activity_rollups_user_id"), table_name="activity_rollups")
+        op.drop_table("activity_rollups")
@@ -0,0 +1,50 @@
+"""compressed note content
+
+Revision ID: e7f2a4c8b913
+Revises: d3a9c6e1f7b4
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.compression import COMPRESSED_COLUMNS, compress_existing, decompress_existing
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7f2a4c8b913"
+down_revision: Union[str, None] = "d3a9c6e1f7b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("notes") as batch:
+        batch.add_column(sa.Column("content_length", sa.Integer(), nullable=False, server_default="0"))
+
+    # batches commit one by one so writers are never blocked for long; rows the
+    # app writes meanwhile are already compressed and carry their length
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        max_id = bind.scalar(sa.text("SELECT MAX(id) FROM notes")) or 0
+        for low in range(0, max_id, BATCH_SIZE):
+            bind.execute(
+                sa.text("UPDATE notes SET content_length = length(content) WHERE id > :low AND id <= :high"),
+                {"low": low, "high": low + BATCH_SIZE},
+            )
+        for table, column in COMPRESSED_COLUMNS:
+            compress_existing(bind, table, column, BATCH_SIZE, commit=False)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        for table, column in COMPRESSED_COLUMNS:
+            decompress_existing(bind, table, column, BATCH_SIZE, commit=False)
+
+    with op.batch_alter_table("notes") as batch:
+        batch.drop_column("content_length")
@@ -1,7 +1,16 @@
 from fastapi import APIRouter
-from app.api.routes import auth, users, notes
+from app.core.config import settings
+from app.api.routes import auth, users, notes, notes_async, live
 
-api_router = APIRouter()
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(notes.router, prefix="/notes", tags=["notes"])
+def build_api_router(async_db: bool = False) -> APIRouter:
+    router = APIRouter()
+    router.include_router(auth.router, prefix="/auth", tags=["auth"])
+    router.include_router(users.router, prefix="/users", tags=["users"])
+    if async_db:
+        # registered first so these paths win over their sync counterparts
+        router.include_router(notes_async.router, prefix="/notes", tags=["notes"])
+    router.include_router(notes.router, prefix="/notes", tags=["notes"])
+    router.include_router(live.router, prefix="/ws", tags=["live"])
+    return router
+
+api_router = build_api_router(settings.DB_ASYNC)
@@ -1,21 +1,35 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_db
 from app.schemas.auth import RegisterIn, TokenOut
-from app.crud.user import create_user, authenticate
-from app.core.security import create_access_token
+from app.crud.user import create_user, ensure_email_available, get_user_by_email
+from app.core.security import create_access_token, hash_password_async, verify_password_async
 
 router = APIRouter()
 
+# These routes are async so bcrypt runs on the dedicated hashing pool; the
+# DB calls still go through the regular thread pool. The session is closed
+# before hashing so no pooled connection is held while bcrypt runs.
+
 @router.post("/register", response_model=dict)
-def register(payload: RegisterIn, db: Session = Depends(get_db)):
-    user = create_user(db, payload.email, payload.password)
+async def register(payload: RegisterIn, db: Session = Depends(get_db)):
+    await run_in_threadpool(ensure_email_available, db, payload.email)
+    await run_in_threadpool(db.close)
+    hashed = await hash_password_async(payload.password)
+    user = await run_in_threadpool(create_user, db, payload.email, hashed_password=hashed)
     return {"message": "User created", "user_id": user.id}
 
 @router.post("/login", response_model=TokenOut)
-def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate(db, form.username, form.password)
+async def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(get_user_by_email, db, form.username)
+    await run_in_threadpool(db.close)
+    if not user or not await verify_password_async(form.password, user.hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials",
+        )
     token = create_access_token(subject=str(user.id))
     return TokenOut(access_token=token)
@@ -0,0 +1,57 @@
+"""Live note editing over WebSockets; see app.core.live for the protocol."""
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_db
+from app.api.routes.users import principal_for_token
+from app.core.live import CLOSE_NOTE_DELETED, NoteGone, Subscriber, live_hub
+from app.core.principal import Principal
+from app.crud import collaborator as collab_crud
+from app.crud.activity import record_activity
+from app.models.activity_log import ActionType
+from app.schemas.note import LiveEdit
+
+router = APIRouter()
+
+def _authorize(db: Session, token: str, note_id: int) -> tuple[Principal, str]:
+    user = principal_for_token(db, token)
+    _, role = collab_crud.get_note_with_access(db, note_id, user.id, load_content=False)
+    return user, role
+
+@router.websocket("/notes/{note_id}")
+async def live_note(websocket: WebSocket, note_id: int, token: str | None = None, db: Session = Depends(get_db)):
+    """Subscribe to a note's live edits. Browsers can't set headers on a
+    WebSocket, so the access token may also be passed as ``?token=``."""
+    token = token or websocket.headers.get("authorization", "").removeprefix("Bearer ").strip()
+    try:
+        user, role = await run_in_threadpool(_authorize, db, token, note_id)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return
+    bind = db.get_bind()
+    # the channel opens its own sessions; don't hold a connection for the whole subscription
+    db.close()
+
+    await websocket.accept()
+    sub = Subscriber(websocket, user.id, role)
+    try:
+        channel = await live_hub.join(bind, note_id, sub)
+    except NoteGone:
+        await websocket.close(code=CLOSE_NOTE_DELETED, reason="Note not found")
+        return
+    record_activity(bind, user.id, ActionType.VIEW, note_id)
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                edit = LiveEdit.model_validate_json(text)
+            except ValidationError as e:
+                channel.send(sub, {"type": "error", "detail": e.errors(include_url=False, include_context=False, include_input=False)})
+                continue
+            channel.apply(sub, edit.rev, edit.ops)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await live_hub.leave(channel, sub)
@@ -1,38 +1,127 @@
-from fastapi import APIRouter, Depends, Query, status
+import tempfile
+import zipfile
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+
 from app.core.deps import get_db
 from app.api.routes.users import get_current_user
-from app.models.user import User
+from app.core.principal import Principal
 from app.models.activity_log import ActionType
-from app.schemas.note import NoteCreate, NoteUpdate, NoteOut, NoteWithRoleOut
-from app.schemas.version import VersionOut
+from app.schemas.note import (
+    NoteCreate, NoteUpdate, NoteOut, NoteWithRoleOut, NoteView, NoteSummaryOut, NoteSummaryWithRoleOut,
+    NoteBatchIn, NoteBatchResult, ExportFormat, NoteImportResult, NotePatch,
+)
+from app.schemas.version import VersionOut, VersionCompactionOut, VersionDiffOut, DiffFormat
 from app.schemas.collaborator import ShareNoteIn, CollaboratorOut
-from app.schemas.activity import ActivityLogOut
+from app.schemas.activity import ActivityLogOut, NoteStatsOut
 from app.crud import note as note_crud
 from app.crud import collaborator as collab_crud
 from app.crud import activity as activity_crud
+from app.crud import export as export_crud
+from app.crud.note_import import NoteImporter
+from app.utils.etag import check_etag, is_conditional, make_etag
+from app.utils.ndjson import stream_lines
+from app.utils.pagination import PageParams, set_next_cursor
 
 router = APIRouter()
 
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+# zip uploads are spooled to disk beyond this size
+IMPORT_SPOOL_BYTES = 1024 * 1024
+
+VIEW_QUERY = Query(default=NoteView.full, description="'summary' returns a preview and content length instead of the content")
+
 @router.post("", response_model=NoteOut, status_code=status.HTTP_201_CREATED)
-def create_note(payload: NoteCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def create_note(payload: NoteCreate, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     note = note_crud.create_note(db, user.id, payload.title, payload.content)
     activity_crud.log_activity(db, user.id, ActionType.CREATE, note.id, f"Created note: {note.title}")
     return note
 
-@router.get("", response_model=list[NoteOut])
+_BATCH_ACTIONS = {"create": ActionType.CREATE, "update": ActionType.UPDATE, "delete": ActionType.DELETE}
+
+@router.post("/batch", response_model=list[NoteBatchResult])
+def batch_notes(payload: NoteBatchIn, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    """Create, update and delete many notes in one transaction.
+
+    Returns one result per operation, in order. Operations that fail their
+    access check get a 403/404 status and are skipped; the others are committed together.
+    """
+    results = note_crud.apply_batch(db, user.id, payload.operations)
+    for r in results:
+        if r["status"] < 400:
+            activity_crud.log_activity(db, user.id, _BATCH_ACTIONS[r["op"]], r["id"], f"Batch {r['op']}")
+    return results
+
+@router.post("/import", response_model=NoteImportResult)
+async def import_notes(request: Request, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    """Create notes from an NDJSON upload (or a zip of NDJSON files), read incrementally from the request body."""
+    importer = NoteImporter(db, user.id)
+    if request.headers.get("content-type", "").split(";")[0].strip() in ZIP_CONTENT_TYPES:
+        # a zip's directory is at its end, so the archive has to be spooled first
+        with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as f:
+            async for chunk in request.stream():
+                f.write(chunk)
+            f.seek(0)
+            try:
+                await run_in_threadpool(importer.add_zip, f)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail="Not a zip archive")
+    else:
+        lineno = 0
+        async for line in stream_lines(request.stream(), settings.NOTE_IMPORT_MAX_LINE_BYTES):
+            lineno += 1
+            if importer.add(line, lineno):
+                await run_in_threadpool(importer.flush)
+        await run_in_threadpool(importer.flush)
+    if importer.imported:
+        activity_crud.log_activity(db, user.id, ActionType.CREATE, None, f"Imported {importer.imported} notes")
+    return importer.result()
+
+@router.get("", response_model=list[NoteOut] | list[NoteSummaryOut])
 def list_notes(
+    request: Request,
+    response: Response,
     q: str | None = Query(default=None, description="Search by title/content (optional)"),
+    view: NoteView = VIEW_QUERY,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    return note_crud.list_notes(db, user.id, q=q)
+    summary = view == NoteView.summary
+    if is_conditional(request):
+        # Tag the page from (id, updated_at) alone; only load notes if it changed
+        etag = note_crud.list_notes_etag(db, user.id, q=q, limit=page.limit, cursor=page.cursor, summary=summary)
+        not_modified = check_etag(request, response, etag)
+        if not_modified:
+            return not_modified
+    result = note_crud.list_notes(db, user.id, q=q, limit=page.limit, cursor=page.cursor, summary=summary)
+    response.headers["ETag"] = note_crud.notes_page_etag(result, summary)
+    notes = set_next_cursor(response, result)
+    return [NoteSummaryOut.model_validate(n) for n in notes] if summary else notes
 
-@router.get("/shared", response_model=list[NoteWithRoleOut])
-def list_shared_notes(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+@router.get("/shared", response_model=list[NoteWithRoleOut] | list[NoteSummaryWithRoleOut])
+def list_shared_notes(
+    response: Response,
+    view: NoteView = VIEW_QUERY,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
     """List notes shared with the current user."""
-    results = note_crud.list_shared_notes(db, user.id)
+    summary = view == NoteView.summary
+    results = set_next_cursor(
+        response, note_crud.list_shared_notes(db, user.id, limit=page.limit, cursor=page.cursor, summary=summary)
+    )
+    if summary:
+        return [
+            NoteSummaryWithRoleOut(**NoteSummaryOut.model_validate(r["note"]).model_dump(), role=r["role"].value)
+            for r in results
+        ]
     return [
         NoteWithRoleOut(
             id=r["note"].id,
@@ -46,39 +135,75 @@ def list_shared_notes(db: Session = Depends(get_db), user: User = Depends(get_cu
         for r in results
     ]
 
-@router.get("/search", response_model=list[NoteOut])
+@router.get("/search", response_model=list[NoteOut] | list[NoteSummaryOut])
 def search_notes(
+    response: Response,
     q: str = Query(..., min_length=1, description="Search query"),
+    view: NoteView = VIEW_QUERY,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """Search notes by title or content (owned + shared). The summary view previews a snippet around the matches."""
+    summary = view == NoteView.summary
+    result = note_crud.search_notes(db, user.id, q, limit=page.limit, cursor=page.cursor, summary=summary)
+    notes = set_next_cursor(response, result)
+    return [NoteSummaryOut.model_validate(n) for n in notes] if summary else notes
+
+@router.get("/export")
+def export_notes(
+    format: ExportFormat = Query(default=ExportFormat.ndjson),
+    versions: bool = Query(default=False, description="include every note's version history"),
+    collaborators: bool = Query(default=False, description="include who each note is shared with"),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ):
-    """Search notes by title or content (owned + shared)."""
-    return note_crud.search_notes(db, user.id, q)
+    """Stream every note the caller owns as NDJSON, or as a zip of NDJSON files."""
+    if format == ExportFormat.zip:
+        body = export_crud.export_zip(db.get_bind(), user.id, versions, collaborators)
+        media_type, filename = "application/zip", "notes-export.zip"
+    else:
+        body = export_crud.export_ndjson(db.get_bind(), user.id, versions, collaborators)
+        media_type, filename = "application/x-ndjson", "notes-export.ndjson"
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
 
 @router.get("/{note_id}", response_model=NoteOut)
-def get_note(note_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    note, role = collab_crud.get_note_with_access(db, note_id, user.id)
+def get_note(note_id: int, request: Request, response: Response, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    # Conditional polls defer the content column; it's only loaded if the note changed
+    note, role = collab_crud.get_note_with_access(db, note_id, user.id, load_content=not is_conditional(request))
     activity_crud.log_activity(db, user.id, ActionType.VIEW, note_id)
+    not_modified = check_etag(request, response, note_crud.note_etag(note))
+    if not_modified:
+        return not_modified
     return note
 
 @router.put("/{note_id}", response_model=NoteOut)
-def update_note(note_id: int, payload: NoteUpdate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def update_note(note_id: int, payload: NoteUpdate, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     # Check edit access (owner or editor)
-    collab_crud.require_edit_access(db, note_id, user.id)
-    note = note_crud.update_note(db, note_id, user.id, payload.title, payload.content)
+    note = collab_crud.require_edit_access(db, note_id, user.id)
+    note = note_crud.update_note(db, note, user.id, payload.title, payload.content)
+    activity_crud.log_activity(db, user.id, ActionType.UPDATE, note_id, f"Updated note")
+    return note
+
+@router.patch("/{note_id}", response_model=NoteOut)
+def patch_note(note_id: int, payload: NotePatch, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    """Apply text operations to the note's content; 409 if it moved past the client's base."""
+    note = collab_crud.require_edit_access(db, note_id, user.id)
+    note = note_crud.patch_note(db, note, user.id, payload.base_version, payload.base_hash, payload.title, payload.ops)
     activity_crud.log_activity(db, user.id, ActionType.UPDATE, note_id, f"Updated note")
     return note
 
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_note(note_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    note_crud.delete_note(db, note_id, user.id)
+def delete_note(note_id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    note = collab_crud.require_owner(db, note_id, user.id)
+    note_crud.delete_note(db, note, user.id)
     activity_crud.log_activity(db, user.id, ActionType.DELETE, note_id, "Deleted note")
     return None
 
 # ----- Collaborator endpoints -----
 
 @router.post("/{note_id}/share", response_model=CollaboratorOut)
-def share_note(note_id: int, payload: ShareNoteIn, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def share_note(note_id: int, payload: ShareNoteIn, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     """Share a note with another user."""
     collab = collab_crud.add_collaborator(db, note_id, user.id, payload.email, payload.role.value)
     activity_crud.log_activity(db, user.id, ActionType.SHARE, note_id, f"Shared with {payload.email} as {payload.role.value}")
@@ -92,41 +217,112 @@ def share_note(note_id: int, payload: ShareNoteIn, db: Session = Depends(get_db)
     )
 
 @router.delete("/{note_id}/share/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def unshare_note(note_id: int, user_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def unshare_note(note_id: int, user_id: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     """Remove a collaborator from a note."""
     collab_crud.remove_collaborator(db, note_id, user.id, user_id)
     activity_crud.log_activity(db, user.id, ActionType.UNSHARE, note_id, f"Removed collaborator {user_id}")
     return None
 
 @router.get("/{note_id}/collaborators", response_model=list[CollaboratorOut])
-def list_collaborators(note_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def list_collaborators(note_id: int, request: Request, response: Response, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
     """List all collaborators of a note."""
-    return collab_crud.list_collaborators(db, note_id, user.id)
+    collaborators = collab_crud.list_collaborators(db, note_id, user.id)
+    etag = make_etag(note_id, *((c["id"], c["user_id"], c["role"].value) for c in collaborators))
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    return collaborators
 
 # ----- Activity log endpoints -----
 
 @router.get("/{note_id}/activity", response_model=list[ActivityLogOut])
-def get_note_activity(note_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def get_note_activity(
+    note_id: int,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
     """Get activity logs for a specific note."""
-    collab_crud.get_note_with_access(db, note_id, user.id)  # Verify access
-    logs = activity_crud.get_note_activity(db, note_id)
+    collab_crud.get_note_with_access(db, note_id, user.id, load_content=False)  # Verify access
+    logs = set_next_cursor(response, activity_crud.get_note_activity(db, note_id, limit=page.limit, cursor=page.cursor))
     return [ActivityLogOut(**log) for log in logs]
 
+@router.get("/{note_id}/stats", response_model=NoteStatsOut)
+def get_note_stats(
+    note_id: int,
+    days: int = Query(default=30, ge=1, le=366, description="window in days, ending today (UTC)"),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """Activity counts for a note, per action and per day."""
+    collab_crud.get_note_with_access(db, note_id, user.id, load_content=False)  # Verify access
+    return activity_crud.get_note_stats(db, note_id, days)
+
 # ----- Version endpoints -----
 
 @router.get("/{note_id}/versions", response_model=list[VersionOut])
-def list_versions(note_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    collab_crud.get_note_with_access(db, note_id, user.id)  # Verify access
-    return note_crud.list_versions(db, note_id, user.id)
+def list_versions(
+    note_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    collab_crud.get_note_with_access(db, note_id, user.id, load_content=False)  # Verify access
+    etag = note_crud.versions_etag(db, note_id, limit=page.limit, cursor=page.cursor)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+    result = note_crud.list_versions(db, note_id, user.id, limit=page.limit, cursor=page.cursor)
+    return set_next_cursor(response, result)
+
+@router.post("/{note_id}/versions/compact", response_model=VersionCompactionOut)
+def compact_versions(
+    note_id: int,
+    dry_run: bool = Query(default=True, description="only report which versions the retention policy would remove"),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    note, _ = collab_crud.get_note_with_access(db, note_id, user.id, load_content=False)  # Verify access
+    return note_crud.compact_note_versions(db, note, user.id, dry_run=dry_run)
 
 @router.get("/{note_id}/versions/{version_number}", response_model=VersionOut)
-def get_version(note_id: int, version_number: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    collab_crud.get_note_with_access(db, note_id, user.id)  # Verify access
+def get_version(note_id: int, version_number: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    collab_crud.get_note_with_access(db, note_id, user.id, load_content=False)  # Verify access
     return note_crud.get_version(db, note_id, version_number, user.id)
 
+DIFF_FORMAT_QUERY = Query(default=DiffFormat.ops, description="'ops' (compact line operations) or 'unified'")
+
+@router.get("/{note_id}/versions/{from_version}/diff/current", response_model=VersionDiffOut, response_model_exclude_unset=True)
+def diff_version_to_current(
+    note_id: int,
+    from_version: int,
+    format: DiffFormat = DIFF_FORMAT_QUERY,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """Line diff from a version to the note's current content."""
+    note, _ = collab_crud.get_note_with_access(db, note_id, user.id, load_content=False)  # Verify access
+    return note_crud.diff_versions(db, note, from_version, None, format.value)
+
+@router.get("/{note_id}/versions/{from_version}/diff/{to_version}", response_model=VersionDiffOut, response_model_exclude_unset=True)
+def diff_versions(
+    note_id: int,
+    from_version: int,
+    to_version: int,
+    format: DiffFormat = DIFF_FORMAT_QUERY,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+):
+    """Line diff between two versions of a note."""
+    note, _ = collab_crud.get_note_with_access(db, note_id, user.id, load_content=False)  # Verify access
+    return note_crud.diff_versions(db, note, from_version, to_version, format.value)
+
 @router.post("/{note_id}/restore/{version_number}", response_model=NoteOut)
-def restore(note_id: int, version_number: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    collab_crud.require_edit_access(db, note_id, user.id)  # Require edit access
-    note = note_crud.restore_version(db, note_id, version_number, user.id)
+def restore(note_id: int, version_number: int, db: Session = Depends(get_db), user: Principal = Depends(get_current_user)):
+    note = collab_crud.require_edit_access(db, note_id, user.id)  # Require edit access
+    note = note_crud.restore_version(db, note, version_number, user.id)
     activity_crud.log_activity(db, user.id, ActionType.RESTORE, note_id, f"Restored to version {version_number}")
     return note
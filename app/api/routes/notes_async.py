@@ -0,0 +1,122 @@
+"""Async versions of the hot note routes, mounted ahead of ``notes.router``
+when DB_ASYNC is enabled. Everything else keeps using the sync routes."""
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_async_db
+from app.api.routes.users import get_current_user_async
+from app.api.routes.notes import VIEW_QUERY
+from app.core.principal import Principal
+from app.models.activity_log import ActionType
+from app.schemas.note import (
+    NoteCreate, NoteUpdate, NoteOut, NoteWithRoleOut, NoteView, NoteSummaryOut, NoteSummaryWithRoleOut
+)
+from app.crud.aio import note as note_crud
+from app.crud.aio import collaborator as collab_crud
+from app.crud.aio import activity as activity_crud
+from app.crud.note import note_etag, notes_page_etag
+from app.utils.etag import check_etag, is_conditional
+from app.utils.pagination import PageParams, set_next_cursor
+
+router = APIRouter()
+
+@router.post("", response_model=NoteOut, status_code=status.HTTP_201_CREATED)
+async def create_note(payload: NoteCreate, db: AsyncSession = Depends(get_async_db), user: Principal = Depends(get_current_user_async)):
+    note = await note_crud.create_note(db, user.id, payload.title, payload.content)
+    activity_crud.log_activity(db, user.id, ActionType.CREATE, note.id, f"Created note: {note.title}")
+    return note
+
+@router.get("", response_model=list[NoteOut] | list[NoteSummaryOut])
+async def list_notes(
+    request: Request,
+    response: Response,
+    q: str | None = Query(default=None, description="Search by title/content (optional)"),
+    view: NoteView = VIEW_QUERY,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    summary = view == NoteView.summary
+    if is_conditional(request):
+        etag = await note_crud.list_notes_etag(db, user.id, q=q, limit=page.limit, cursor=page.cursor, summary=summary)
+        not_modified = check_etag(request, response, etag)
+        if not_modified:
+            return not_modified
+    result = await note_crud.list_notes(db, user.id, q=q, limit=page.limit, cursor=page.cursor, summary=summary)
+    response.headers["ETag"] = notes_page_etag(result, summary)
+    notes = set_next_cursor(response, result)
+    return [NoteSummaryOut.model_validate(n) for n in notes] if summary else notes
+
+@router.get("/shared", response_model=list[NoteWithRoleOut] | list[NoteSummaryWithRoleOut])
+async def list_shared_notes(
+    response: Response,
+    view: NoteView = VIEW_QUERY,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    """List notes shared with the current user."""
+    summary = view == NoteView.summary
+    results = set_next_cursor(
+        response, await note_crud.list_shared_notes(db, user.id, limit=page.limit, cursor=page.cursor, summary=summary)
+    )
+    if summary:
+        return [
+            NoteSummaryWithRoleOut(**NoteSummaryOut.model_validate(r["note"]).model_dump(), role=r["role"].value)
+            for r in results
+        ]
+    return [
+        NoteWithRoleOut(
+            id=r["note"].id,
+            title=r["note"].title,
+            content=r["note"].content,
+            owner_id=r["note"].owner_id,
+            created_at=r["note"].created_at,
+            updated_at=r["note"].updated_at,
+            role=r["role"].value
+        )
+        for r in results
+    ]
+
+@router.get("/search", response_model=list[NoteOut] | list[NoteSummaryOut])
+async def search_notes(
+    response: Response,
+    q: str = Query(..., min_length=1, description="Search query"),
+    view: NoteView = VIEW_QUERY,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_user_async),
+):
+    """Search notes by title or content (owned + shared). The summary view previews a snippet around the matches."""
+    summary = view == NoteView.summary
+    result = await note_crud.search_notes(db, user.id, q, limit=page.limit, cursor=page.cursor, summary=summary)
+    notes = set_next_cursor(response, result)
+    return [NoteSummaryOut.model_validate(n) for n in notes] if summary else notes
+
+# :int so that static paths served by the sync router (/notes/export) fall through
+@router.get("/{note_id:int}", response_model=NoteOut)
+async def get_note(note_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db), user: Principal = Depends(get_current_user_async)):
+    conditional = is_conditional(request)
+    note, role = await collab_crud.get_note_with_access(db, note_id, user.id, load_content=not conditional)
+    activity_crud.log_activity(db, user.id, ActionType.VIEW, note_id)
+    not_modified = check_etag(request, response, note_etag(note))
+    if not_modified:
+        return not_modified
+    if conditional:
+        # deferred columns can't lazy-load outside the greenlet
+        await db.refresh(note, ["content"])
+    return note
+
+@router.put("/{note_id}", response_model=NoteOut)
+async def update_note(note_id: int, payload: NoteUpdate, db: AsyncSession = Depends(get_async_db), user: Principal = Depends(get_current_user_async)):
+    note = await collab_crud.require_edit_access(db, note_id, user.id)
+    note = await note_crud.update_note(db, note, user.id, payload.title, payload.content)
+    activity_crud.log_activity(db, user.id, ActionType.UPDATE, note_id, f"Updated note")
+    return note
+
+@router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_note(note_id: int, db: AsyncSession = Depends(get_async_db), user: Principal = Depends(get_current_user_async)):
+    note = await collab_crud.require_owner(db, note_id, user.id)
+    await note_crud.delete_note(db, note, user.id)
+    activity_crud.log_activity(db, user.id, ActionType.DELETE, note_id, "Deleted note")
+    return None
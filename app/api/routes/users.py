@@ -1,38 +1,75 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.deps import get_db
-from app.core.security import decode_token
+from app.core.deps import get_db, get_async_db
+from app.core.security import decode_token_claims
+from app.core.principal import Principal, principal_cache, cache_principal
 from app.models.user import User
 from app.schemas.user import UserOut
 from app.schemas.activity import ActivityLogOut
 from app.crud import activity as activity_crud
+from app.crud import user as user_crud
+from app.crud.aio import user as user_aio
+from app.utils.pagination import PageParams, set_next_cursor
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
-    user_id = int(decode_token(token))
-    user = db.scalar(select(User).where(User.id == user_id))
+def _remember(token: str, user: User | None, claims: dict) -> Principal:
     if not user:
         from fastapi import HTTPException
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    principal = Principal.from_user(user)
+    cache_principal(token, principal, claims)
+    return principal
+
+def principal_for_token(db: Session, token: str) -> Principal:
+    """Verify ``token`` (or find it in the cache) and return its user; raises 401."""
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    claims = decode_token_claims(token)
+    user = db.scalar(select(User).where(User.id == int(claims["sub"])))
+    return _remember(token, user, claims)
+
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> Principal:
+    return principal_for_token(db, token)
+
+async def get_current_user_async(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> Principal:
+    """Same as get_current_user, for routes on the async database path."""
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    claims = decode_token_claims(token)
+    user = await user_aio.get_user(db, int(claims["sub"]))
+    return _remember(token, user, claims)
 
 @router.get("/", response_model=list[UserOut])
-def list_users(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def list_users(
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
     """Get all users (for sharing functionality)."""
-    users = db.scalars(select(User)).all()
-    return users
+    return set_next_cursor(response, user_crud.list_users(db, limit=page.limit, cursor=page.cursor))
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)):
+def me(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 @router.get("/me/activity", response_model=list[ActivityLogOut])
-def my_activity(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def my_activity(
+    response: Response,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
     """Get current user's activity logs."""
-    logs = activity_crud.get_user_activity(db, current_user.id)
+    logs = set_next_cursor(response, activity_crud.get_user_activity(db, current_user.id, limit=page.limit, cursor=page.cursor))
     return [ActivityLogOut(**log) for log in logs]
@@ -0,0 +1,89 @@
+"""Time-based retention for the raw activity log.
+
+``purge_activity`` deletes ActivityLog rows older than a cutoff in bounded
+batches, each in its own short transaction, so it never holds locks long
+enough to stall the activity sink or the request path. When an archive path is
+given every batch is appended to it as NDJSON before it is deleted (a batch
+whose delete fails may be archived twice). Per-day counts survive in
+ActivityRollup.
+
+``RetentionJob`` runs the purge every ACTIVITY_RETENTION_INTERVAL_SECONDS in a
+background thread. To run it from cron instead:
+
+    python -m app.core.activity_retention --days 30
+"""
+import argparse
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.jobs import PeriodicJob
+from app.models.activity_log import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+
+def _archive(path: str, rows) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(dict(row), default=lambda v: v.isoformat()) + "\n")
+
+
+def purge_activity(bind: Engine, older_than: timedelta, batch_size: int, archive_path: str | None = None) -> int:
+    """Delete activity rows older than ``older_than``. Returns the number purged."""
+    cutoff = datetime.now(timezone.utc) - older_than
+    columns = ActivityLog.__table__.c if archive_path else (ActivityLog.id,)
+    # ids grow with time, so walking them in order finds the old rows first
+    stmt = select(*columns).where(ActivityLog.timestamp < cutoff).order_by(ActivityLog.id).limit(batch_size)
+    purged = 0
+    while True:
+        with bind.begin() as conn:
+            rows = conn.execute(stmt).mappings().all()
+            if not rows:
+                break
+            if archive_path:
+                _archive(archive_path, rows)
+            conn.execute(delete(ActivityLog).where(ActivityLog.id.in_([row["id"] for row in rows])))
+        purged += len(rows)
+        if len(rows) < batch_size:
+            break
+    return purged
+
+
+class RetentionJob(PeriodicJob):
+    name = "activity-retention"
+
+    def __init__(self, bind: Engine, days: int, batch_size: int, interval: float, archive_path: str | None = None):
+        super().__init__(interval)
+        self.bind = bind
+        self.older_than = timedelta(days=days)
+        self.batch_size = batch_size
+        self.archive_path = archive_path
+
+    def run_once(self) -> int:
+        purged = purge_activity(self.bind, self.older_than, self.batch_size, self.archive_path)
+        if purged:
+            logger.info("Purged %d activity rows older than %s", purged, self.older_than)
+        return purged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Purge activity log rows past the retention age.")
+    parser.add_argument("--days", type=int, default=settings.ACTIVITY_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ACTIVITY_RETENTION_BATCH_SIZE)
+    parser.add_argument("--archive", default=settings.ACTIVITY_ARCHIVE_PATH, help="append purged rows here as NDJSON")
+    args = parser.parse_args()
+    if args.days <= 0:
+        parser.error("--days must be positive")
+
+    from app.db.session import engine
+    purged = purge_activity(engine, timedelta(days=args.days), args.batch_size, args.archive)
+    print(f"purged {purged} activity rows")
+
+
+if __name__ == "__main__":
+    main()
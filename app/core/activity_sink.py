@@ -0,0 +1,166 @@
+"""Write-behind buffer for activity log rows.
+
+Requests enqueue activity events and return without waiting for a commit. A
+background thread bulk-inserts the buffer whenever it reaches
+ACTIVITY_FLUSH_BATCH_SIZE rows or every ACTIVITY_FLUSH_INTERVAL_SECONDS.
+Repeated VIEW events of the same user on the same note inside
+ACTIVITY_VIEW_DEDUP_SECONDS are collapsed into the first one.
+
+Each flush also adds its rows to the ActivityRollup counters in the same
+transaction, so per-note stats never need to scan the raw log.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.models.activity_log import ActivityLog, ActivityRollup, ActionType
+
+logger = logging.getLogger(__name__)
+
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def bump_rollups(conn: Connection, rows: list[dict]) -> None:
+    """Add ``rows`` to the per-day ActivityRollup counters.
+
+    Rows without a note (or for a deleted one) have no stats to count towards.
+    """
+    counts = Counter(
+        (row["note_id"], row["user_id"], row["timestamp"].date(), row["action"])
+        for row in rows
+        if row["note_id"] is not None and row["action"] != ActionType.DELETE
+    )
+    if not counts:
+        return
+    params = [
+        {"note_id": note_id, "user_id": user_id, "day": day, "action": action, "count": n}
+        for (note_id, user_id, day, action), n in counts.items()
+    ]
+    dialect_insert = _UPSERT_INSERTS.get(conn.dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(ActivityRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["note_id", "day", "user_id", "action"],
+            set_={"count": ActivityRollup.count + stmt.excluded["count"]},
+        )
+        conn.execute(stmt, params)
+        return
+    for p in params:
+        bumped = conn.execute(
+            update(ActivityRollup)
+            .where(
+                ActivityRollup.note_id == p["note_id"],
+                ActivityRollup.day == p["day"],
+                ActivityRollup.user_id == p["user_id"],
+                ActivityRollup.action == p["action"],
+            )
+            .values(count=ActivityRollup.count + p["count"])
+        )
+        if bumped.rowcount == 0:
+            conn.execute(insert(ActivityRollup), [p])
+
+
+class ActivitySink:
+    def __init__(self, batch_size: int, interval: float, view_window: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.view_window = view_window
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._buffer: list[tuple[Engine, dict]] = []
+        self._last_view: dict[tuple, float] = {}
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def add(self, bind: Engine, row: dict) -> None:
+        """Queue one activity row to be inserted through ``bind``."""
+        now = time.monotonic()
+        with self._lock:
+            if row["action"] == ActionType.VIEW:
+                key = (id(bind), row["user_id"], row["note_id"])
+                last = self._last_view.get(key)
+                if last is not None and now - last < self.view_window:
+                    return
+                self._last_view[key] = now
+            self._buffer.append((bind, row))
+            full = len(self._buffer) >= self.batch_size
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="activity-sink", daemon=True)
+                self._thread.start()
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Insert everything buffered so far. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+                cutoff = time.monotonic() - self.view_window
+                self._last_view = {k: t for k, t in self._last_view.items() if t >= cutoff}
+            if not batch:
+                return 0
+
+            by_bind: dict[Engine, list[dict]] = defaultdict(list)
+            for bind, row in batch:
+                by_bind[bind].append(row)
+            for bind, rows in by_bind.items():
+                self._write(bind, rows)
+            return len(batch)
+
+    def close(self) -> None:
+        """Stop the background thread and flush what is left."""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+        self.flush()
+        self._closed = False
+
+    def _write(self, bind: Engine, rows: list[dict]) -> None:
+        try:
+            with bind.begin() as conn:
+                conn.execute(insert(ActivityLog), rows)
+                bump_rollups(conn, rows)
+            return
+        except SQLAlchemyError:
+            logger.warning("Bulk activity insert failed, retrying %d rows one by one", len(rows), exc_info=True)
+
+        for row in rows:
+            # a note deleted meanwhile can't be referenced any more: keep the row, drop the link
+            for candidate in (row, {**row, "note_id": None}):
+                try:
+                    with bind.begin() as conn:
+                        conn.execute(insert(ActivityLog), [candidate])
+                        bump_rollups(conn, [candidate])
+                    break
+                except SQLAlchemyError:
+                    continue
+            else:
+                logger.error("Dropping activity row %r", row)
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Activity flush failed")
+
+
+activity_sink = ActivitySink(
+    batch_size=settings.ACTIVITY_FLUSH_BATCH_SIZE,
+    interval=settings.ACTIVITY_FLUSH_INTERVAL_SECONDS,
+    view_window=settings.ACTIVITY_VIEW_DEDUP_SECONDS,
+)
+
@@ -5,11 +5,86 @@ class Settings(BaseSettings):
     ENV: str = "dev"
 
     DATABASE_URL: str
+    # serve the hot note routes through an async engine (aiosqlite / asyncpg)
+    DB_ASYNC: bool = False
+    # pool_size + max_overflow should cover the AnyIO thread pool (40 by default):
+    # a sync request holds its connection until its dependency teardown gets a
+    # worker thread, so a smaller pool can deadlock under load
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 35
+
+    # Prometheus metrics at /metrics; Server-Timing headers on every response
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING: bool = False
 
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+    # operations accepted by one POST /notes/batch request
+    NOTE_BATCH_MAX_OPERATIONS: int = 1000
+    # text operations accepted by one PATCH /notes/{id}
+    NOTE_PATCH_MAX_OPS: int = 1000
+    # live editing over /ws/notes/{id}: edits are written to the note at most
+    # once per interval; a subscriber that falls this many messages behind is
+    # disconnected
+    LIVE_FLUSH_INTERVAL_SECONDS: float = 2.0
+    LIVE_SEND_QUEUE_SIZE: int = 256
+    # POST /notes/import: notes inserted per transaction, longest accepted line,
+    # and how many per-line errors are listed in the response
+    NOTE_IMPORT_CHUNK_SIZE: int = 500
+    NOTE_IMPORT_MAX_LINE_BYTES: int = 5 * 1024 * 1024
+    NOTE_IMPORT_MAX_ERRORS: int = 100
+    # characters of content returned as the preview in ?view=summary listings
+    NOTE_PREVIEW_LENGTH: int = 200
+
+    # note content and version snapshots of at least this many bytes are stored
+    # zlib-compressed (SQLite only; PostgreSQL compresses large values itself)
+    CONTENT_COMPRESSION_MIN_BYTES: int = 1024
+    CONTENT_COMPRESSION_LEVEL: int = 6
+
+    # a full content snapshot every N versions, deltas in between (1 = always full)
+    VERSION_KEYFRAME_INTERVAL: int = 20
+    # version history thinning: versions at least AGE seconds old keep only the
+    # newest one per BUCKET seconds, as [[AGE, BUCKET], ...]; younger versions are
+    # all kept. Default: hourly after an hour, daily after a day, weekly after
+    # 30 days, monthly after a year. An empty list turns thinning off.
+    VERSION_RETENTION_TIERS: list[tuple[int, int]] = [
+        (3600, 3600), (86400, 86400), (30 * 86400, 7 * 86400), (365 * 86400, 30 * 86400),
+    ]
+    VERSION_COMPACTION_INTERVAL_SECONDS: float = 3600.0
+    # notes compacted per transaction
+    VERSION_COMPACTION_BATCH_SIZE: int = 100
+    # computed version diffs kept in memory; past MAX_EDITS changed lines a diff
+    # reports the changed region as one replace instead of searching further
+    VERSION_DIFF_CACHE_SIZE: int = 256
+    VERSION_DIFF_MAX_EDITS: int = 1000
+
+    # activity log write-behind buffer
+    ACTIVITY_FLUSH_BATCH_SIZE: int = 500
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: float = 1.0
+    ACTIVITY_VIEW_DEDUP_SECONDS: float = 60.0
+    # raw activity rows older than this are purged (0 keeps them forever); the
+    # per-day rollups are kept. Rows go in batches of ACTIVITY_RETENTION_BATCH_SIZE,
+    # appended to ACTIVITY_ARCHIVE_PATH (NDJSON) first when it is set
+    ACTIVITY_RETENTION_DAYS: int = 90
+    ACTIVITY_RETENTION_BATCH_SIZE: int = 1000
+    ACTIVITY_RETENTION_INTERVAL_SECONDS: float = 3600.0
+    ACTIVITY_ARCHIVE_PATH: str | None = None
+
+    # (note_id, user_id) -> collaborator role entries kept in memory
+    ACL_CACHE_SIZE: int = 10000
+
+    # verified token -> principal; entries never outlive the token itself
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 300.0
+
+    # dedicated bcrypt pool; beyond MAX_PENDING queued hashes /auth answers 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 settings = Settings()
@@ -1,4 +1,4 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from app.db.session import SessionLocal
 
 def get_db() -> Generator:
@@ -7,3 +7,10 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncGenerator:
+    # imported lazily so sync-only deployments don't need the async drivers
+    from app.db.async_session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,37 @@
+"""Periodic background jobs run in daemon threads by the app lifespan."""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Calls ``run_once`` right away and then every ``interval`` seconds until closed."""
+    name = "periodic-job"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> int:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("%s failed", self.name)
+            self._stop.wait(self.interval)
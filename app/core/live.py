@@ -0,0 +1,270 @@
+"""In-process pub/sub for live note editing over WebSockets.
+
+Every note with at least one connected client has a ``NoteChannel`` holding
+the note's live content and a revision counter. An editor sends text ops based
+on the revision it last saw. The channel applies ops in arrival order, bumps
+the revision, and fans the ops out to every subscriber, the sender included
+(that is its acknowledgement). Ops based on an older revision are rejected, and
+the client rebases them on the ops it has received since.
+
+Edits reach the database at most once per LIVE_FLUSH_INTERVAL_SECONDS, and when
+the last subscriber leaves. Each write goes through ``update_note``, so a burst
+of keystrokes becomes one version. If the note was changed through the HTTP
+API in the meantime, the write is refused. The channel then reloads the note
+and sends everyone a fresh snapshot; live edits since the last write are lost.
+
+Messages to a subscriber are queued and sent by their own task. A subscriber
+whose queue fills up is disconnected instead of slowing down everyone else.
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import note as note_crud
+from app.crud.activity import record_activity
+from app.models.activity_log import ActionType
+from app.models.note import Note
+from app.utils.textops import apply_text_ops
+
+logger = logging.getLogger(__name__)
+
+CLOSE_TOO_SLOW = 1013  # "try again later"
+CLOSE_NOTE_DELETED = 4404
+
+
+class NoteGone(Exception):
+    pass
+
+
+@dataclass(eq=False)
+class Subscriber:
+    websocket: WebSocket
+    user_id: int
+    role: str
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(settings.LIVE_SEND_QUEUE_SIZE))
+    sender: asyncio.Task | None = None
+
+    @property
+    def can_edit(self) -> bool:
+        return self.role != "viewer"
+
+    def start(self) -> None:
+        self.sender = asyncio.create_task(self._send())
+
+    def push(self, text: str) -> bool:
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def close(self, code: int) -> None:
+        if self.sender is not None:
+            self.sender.cancel()
+        try:
+            await self.websocket.close(code)
+        except RuntimeError:  # already closed
+            pass
+
+    async def _send(self) -> None:
+        while True:
+            await self.websocket.send_text(await self.queue.get())
+
+
+def _load(bind: Engine, note_id: int) -> tuple[str, int]:
+    with Session(bind) as db:
+        note = db.get(Note, note_id)
+        if note is None:
+            raise NoteGone(note_id)
+        return note.content, note.current_version
+
+
+def _persist(bind: Engine, note_id: int, content: str, version: int, user_id: int) -> tuple[str | None, int]:
+    """Write the live content if the note is still at ``version``.
+
+    Returns (None, new version) on success, or (the stored content, its
+    version) if someone else changed the note.
+    """
+    with Session(bind) as db:
+        note = db.get(Note, note_id)
+        if note is None:
+            raise NoteGone(note_id)
+        try:
+            note = note_crud.update_note(db, note, user_id, None, content, expected_version=version)
+        except HTTPException as e:
+            if e.status_code != 409:
+                raise
+            return note.content, note.current_version
+        version = note.current_version
+    record_activity(bind, user_id, ActionType.UPDATE, note_id, "Edited live")
+    return None, version
+
+
+class NoteChannel:
+    def __init__(self, hub: "LiveHub", bind: Engine, note_id: int):
+        self.hub = hub
+        self.bind = bind
+        self.note_id = note_id
+        self.subscribers: set[Subscriber] = set()
+        self.content = ""
+        self.version = 0  # the note's current_version as last read or written
+        self.rev = 0  # live revision, bumped by every accepted change
+        self.saved_rev = 0
+        self.last_editor: int | None = None
+        self.loaded: asyncio.Task = asyncio.create_task(self._load())
+        self._flusher: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
+    async def _load(self) -> None:
+        self.content, self.version = await run_in_threadpool(_load, self.bind, self.note_id)
+
+    def snapshot(self, role: str | None = None, reason: str | None = None) -> dict:
+        msg = {"type": "snapshot", "rev": self.rev, "version": self.version, "content": self.content}
+        if role is not None:
+            msg["role"] = role
+        if reason is not None:
+            msg["reason"] = reason
+        return msg
+
+    def send(self, sub: Subscriber, msg: dict) -> None:
+        if not sub.push(json.dumps(msg)):
+            self._drop(sub)
+
+    def publish(self, msg: dict) -> None:
+        text = json.dumps(msg)  # encoded once for every subscriber
+        for sub in list(self.subscribers):
+            if not sub.push(text):
+                self._drop(sub)
+
+    def _drop(self, sub: Subscriber) -> None:
+        self.subscribers.discard(sub)
+        asyncio.create_task(sub.close(CLOSE_TOO_SLOW))
+
+    def apply(self, sub: Subscriber, base_rev: int, ops: list) -> None:
+        if not sub.can_edit:
+            return self.send(sub, {"type": "reject", "rev": self.rev, "detail": "Edit access required"})
+        if base_rev != self.rev:
+            return self.send(sub, {"type": "reject", "rev": self.rev, "detail": "Stale revision, rebase and resend"})
+        try:
+            content = apply_text_ops(self.content, ops)
+        except ValueError as e:
+            return self.send(sub, {"type": "reject", "rev": self.rev, "detail": str(e)})
+        if not content:
+            return self.send(sub, {"type": "reject", "rev": self.rev, "detail": "Content cannot be empty"})
+        self.content = content
+        self.rev += 1
+        self.last_editor = sub.user_id
+        self.publish({
+            "type": "ops",
+            "rev": self.rev,
+            "user_id": sub.user_id,
+            "ops": [op.model_dump(mode="json") for op in ops],
+        })
+
+    def start_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_every(settings.LIVE_FLUSH_INTERVAL_SECONDS))
+
+    async def stop_flusher(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+
+    async def _flush_every(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # shielded: stopping the flusher must not abandon a write in progress
+                await asyncio.shield(self.flush())
+            except NoteGone:
+                await self.hub.evict(self, CLOSE_NOTE_DELETED)
+                return
+            except Exception:
+                logger.exception("flushing live edits of note %s failed", self.note_id)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if self.saved_rev == self.rev:
+                return
+            rev, content = self.rev, self.content
+            stored, version = await run_in_threadpool(
+                _persist, self.bind, self.note_id, content, self.version, self.last_editor
+            )
+            if stored is None:
+                self.version, self.saved_rev = version, rev
+                self.publish({"type": "saved", "rev": rev, "version": version})
+            else:
+                # changed outside the channel: its content wins
+                self.content, self.version = stored, version
+                self.rev += 1
+                self.saved_rev = self.rev
+                self.publish(self.snapshot(reason="conflict"))
+
+
+class LiveHub:
+    """The channels of this process, one per note with live subscribers."""
+
+    def __init__(self):
+        self.channels: dict[int, NoteChannel] = {}
+
+    async def join(self, bind: Engine, note_id: int, sub: Subscriber) -> NoteChannel:
+        """Subscribe and queue the snapshot for ``sub``; raises NoteGone."""
+        channel = self.channels.get(note_id)
+        if channel is None:
+            channel = self.channels[note_id] = NoteChannel(self, bind, note_id)
+        try:
+            await asyncio.shield(channel.loaded)
+        except NoteGone:
+            if self.channels.get(note_id) is channel:
+                del self.channels[note_id]
+            raise
+        sub.start()
+        channel.subscribers.add(sub)
+        channel.send(sub, channel.snapshot(role=sub.role))
+        channel.start_flusher()
+        return channel
+
+    async def leave(self, channel: NoteChannel, sub: Subscriber) -> None:
+        channel.subscribers.discard(sub)
+        if sub.sender is not None:
+            sub.sender.cancel()
+        if channel.subscribers:
+            return
+        await channel.stop_flusher()
+        try:
+            await channel.flush()
+        except NoteGone:
+            pass
+        finally:
+            # someone may have joined while the last edits were written
+            if channel.subscribers:
+                channel.start_flusher()
+            elif self.channels.get(channel.note_id) is channel:
+                del self.channels[channel.note_id]
+
+    async def evict(self, channel: NoteChannel, code: int) -> None:
+        if self.channels.get(channel.note_id) is channel:
+            del self.channels[channel.note_id]
+        subscribers, channel.subscribers = channel.subscribers, set()
+        for sub in subscribers:
+            await sub.close(code)
+
+    async def close(self) -> None:
+        """Write out pending edits and disconnect everyone (app shutdown)."""
+        for channel in list(self.channels.values()):
+            await channel.stop_flusher()
+            try:
+                await channel.flush()
+            except Exception:
+                logger.exception("flushing live edits of note %s failed", channel.note_id)
+            await self.evict(channel, 1001)
+
+
+live_hub = LiveHub()
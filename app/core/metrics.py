@@ -0,0 +1,237 @@
+"""Request and database instrumentation, exposed in Prometheus text format.
+
+``MetricsMiddleware`` times every request and keeps per-request statistics in
+a context variable. The SQLAlchemy listeners installed by ``instrument_engine``
+add query counts and DB time to those statistics. Sync routes run in a worker
+thread, but that thread gets a copy of the context, so it updates the same
+object. Pool checkout waits are measured by ``TimedQueuePool``.
+
+The exposition format is simple enough to render here without pulling in
+prometheus_client.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_labels(self.labelnames, k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """A gauge set directly, or read from ``callback`` at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, *args, callback=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._value = 0.0
+        self._callback = callback
+
+    def add(self, amount: float) -> None:
+        with self._lock:
+            self._value += amount
+
+    def _samples(self) -> list[str]:
+        value = self._callback() if self._callback else self._value
+        return [f"{self.name} {value}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = buckets
+        # labels -> [count per bucket..., +Inf count, sum]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            row = self._values.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += 1
+            row[-1] += value
+
+    def _samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for labels, row in self._values.items():
+                for bound, count in zip(self.buckets + ("+Inf",), row):
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {row[-1]}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {row[-2]}")
+        return lines
+
+
+registry: list[_Metric] = []
+
+requests_total = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+request_seconds = Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests being served.")
+request_queries = Histogram(
+    "http_request_db_queries", "SQL statements per HTTP request.", ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+request_db_seconds = Histogram("http_request_db_seconds", "Time spent in SQL per HTTP request.", ("method", "route"))
+db_queries_total = Counter("db_queries_total", "SQL statements executed (including background work).")
+db_query_seconds = Histogram("db_query_duration_seconds", "SQL statement latency.")
+pool_wait_seconds = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.")
+
+
+def render() -> str:
+    return "\n".join(line for metric in registry for line in metric.render()) + "\n"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_queries_total.inc()
+    db_query_seconds.observe(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+_engines: list[Engine] = []
+
+pool_checked_out = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    callback=lambda: sum(e.pool.checkedout() for e in _engines if isinstance(e.pool, QueuePool)),
+)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement run through ``engine`` (idempotent)."""
+    if engine in _engines:
+        return
+    _engines.append(engine)
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            pool_wait_seconds.observe(elapsed)
+            stats = _current.get()
+            if stats is not None:
+                stats.pool_wait_seconds += elapsed
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: latency, status and in-flight metrics per route
+    template, plus an optional ``Server-Timing`` header (SERVER_TIMING)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+        requests_in_flight.add(1)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING:
+                    message.setdefault("headers", []).append((b"server-timing", _server_timing(stats, start).encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.add(-1)
+            _current.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", UNMATCHED_ROUTE))
+            requests_total.inc(*labels, str(status))
+            request_seconds.observe(time.perf_counter() - start, *labels)
+            request_queries.observe(stats.queries, *labels)
+            request_db_seconds.observe(stats.db_seconds, *labels)
+
+
+def _server_timing(stats: RequestStats, start: float) -> str:
+    total = (time.perf_counter() - start) * 1000
+    return (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+        f"pool;dur={stats.pool_wait_seconds * 1000:.1f}, app;dur={total:.1f}"
+    )
@@ -0,0 +1,45 @@
+"""Authenticated principal and the cache of verified tokens.
+
+A cache hit lets ``get_current_user`` skip both JWT verification and the user
+lookup. Entries expire after PRINCIPAL_CACHE_TTL_SECONDS or when the token
+itself expires, whichever comes first, and are dropped when the user is deleted.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email, created_at=user.created_at)
+
+
+principal_cache = LRUCache(settings.PRINCIPAL_CACHE_SIZE)
+
+
+def cache_principal(token: str, principal: Principal, claims: dict) -> None:
+    ttl = settings.PRINCIPAL_CACHE_TTL_SECONDS
+    if "exp" in claims:
+        ttl = min(ttl, float(claims["exp"]) - time.time())
+    principal_cache.set(token, principal, ttl=ttl)
+
+
+def invalidate_user(user_id: int) -> None:
+    principal_cache.pop_where(lambda _, principal: principal.id == user_id)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
@@ -1,5 +1,7 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -15,6 +17,57 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+
+class PasswordHasher:
+    """Runs bcrypt on its own bounded thread pool.
+
+    Keeps password hashing off the AnyIO worker threads shared by every sync
+    route (bcrypt releases the GIL, so the workers use separate cores). When
+    more than ``max_pending`` hashes are queued or running, new requests are
+    rejected with 503 straight away instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def run(self, fn: Callable, *args):
+        # only touched from the event loop, so the counter needs no lock
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent sign-ins, please retry",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self.pending += 1
+        try:
+            return await asyncio.wrap_future(self._executor.submit(fn, *args))
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await password_hasher.run(verify_password, plain, hashed)
+
 def create_access_token(subject: str, expires_minutes: Optional[int] = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -23,12 +76,15 @@ def create_access_token(subject: str, expires_minutes: Optional[int] = None) ->
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 def decode_token(token: str) -> str:
+    return decode_token_claims(token)["sub"]
+
+def decode_token_claims(token: str) -> dict:
+    """Verify a token and return its claims (at least ``sub`` and ``exp``)."""
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        sub = payload.get("sub")
-        if not sub:
+        if not payload.get("sub"):
             raise ValueError("Missing subject")
-        return sub
+        return payload
     except (JWTError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
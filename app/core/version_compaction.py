@@ -0,0 +1,61 @@
+"""Background thinning of note version histories.
+
+``VersionCompactionJob`` walks the notes in id order, VERSION_COMPACTION_BATCH_SIZE
+at a time, and applies the VERSION_RETENTION_TIERS policy to each batch in its
+own transaction (see ``app.crud.note.compact_versions``). To run one pass from
+cron instead:
+
+    python -m app.core.version_compaction
+"""
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.jobs import PeriodicJob
+from app.crud import note as note_crud
+from app.models.note import Note
+
+logger = logging.getLogger(__name__)
+
+
+def compact_all(session_factory: sessionmaker, batch_size: int) -> int:
+    """Compact every note with more than one version. Returns the number of versions removed."""
+    removed = 0
+    last_id = 0
+    while True:
+        with session_factory() as db:
+            note_ids = db.scalars(
+                select(Note.id).where(Note.id > last_id, Note.current_version > 1).order_by(Note.id).limit(batch_size)
+            ).all()
+            if not note_ids:
+                break
+            plans = note_crud.compact_versions(db, list(note_ids))
+        removed += sum(len(dropped) for _, dropped in plans.values())
+        last_id = note_ids[-1]
+    return removed
+
+
+class VersionCompactionJob(PeriodicJob):
+    name = "version-compaction"
+
+    def __init__(self, session_factory: sessionmaker, batch_size: int, interval: float):
+        super().__init__(interval)
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    def run_once(self) -> int:
+        removed = compact_all(self.session_factory, self.batch_size)
+        if removed:
+            logger.info("Compacted away %d note versions", removed)
+        return removed
+
+
+def main() -> None:
+    from app.db.session import SessionLocal
+    print(f"removed {compact_all(SessionLocal, settings.VERSION_COMPACTION_BATCH_SIZE)} note versions")
+
+
+if __name__ == "__main__":
+    main()
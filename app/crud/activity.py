@@ -1,9 +1,14 @@
+from datetime import datetime, timedelta, timezone
+
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import distinct, func, select
+from sqlalchemy.engine import Engine
 
-from app.models.activity_log import ActivityLog, ActionType
+from app.core.activity_sink import activity_sink
+from app.models.activity_log import ActivityLog, ActivityRollup, ActionType
 from app.models.user import User
 from app.models.note import Note
+from app.utils.pagination import Page, paginate, seek
 
 def log_activity(
     db: Session,
@@ -11,31 +16,43 @@ def log_activity(
     action: ActionType,
     note_id: int | None = None,
     details: str | None = None
-) -> ActivityLog:
-    """Log an activity."""
-    log = ActivityLog(
-        user_id=user_id,
-        note_id=note_id,
-        action=action,
-        details=details
-    )
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-    return log
+) -> None:
+    """Log an activity. The row is buffered and written in bulk by the activity sink."""
+    record_activity(db.get_bind(), user_id, action, note_id, details)
+
+def record_activity(
+    bind: Engine,
+    user_id: int,
+    action: ActionType,
+    note_id: int | None = None,
+    details: str | None = None
+) -> None:
+    """Queue an activity row to be written through ``bind``."""
+    activity_sink.add(bind, {
+        "user_id": user_id,
+        "note_id": note_id,
+        "action": action,
+        "details": details,
+        "timestamp": datetime.now(timezone.utc),
+    })
+
+def _log_key(row: dict) -> tuple:
+    return row["timestamp"], row["id"]
 
-def get_note_activity(db: Session, note_id: int, limit: int = 50) -> list[dict]:
-    """Get activity logs for a specific note."""
+def get_note_activity(db: Session, note_id: int, limit: int = 50, cursor: str | None = None) -> Page:
+    """Get activity logs for a specific note, newest first."""
+    activity_sink.flush()  # read your own writes
     stmt = (
         select(ActivityLog, User.email)
         .join(User, ActivityLog.user_id == User.id)
         .where(ActivityLog.note_id == note_id)
-        .order_by(ActivityLog.timestamp.desc())
-        .limit(limit)
+        .order_by(ActivityLog.timestamp.desc(), ActivityLog.id.desc())
     )
-    results = db.execute(stmt).all()
+    if cursor:
+        stmt = stmt.where(seek(db, (ActivityLog.timestamp, ActivityLog.id), cursor))
+    results = db.execute(stmt.limit(limit + 1)).all()
     
-    return [
+    rows = [
         {
             "id": log.id,
             "user_id": log.user_id,
@@ -47,19 +64,22 @@ def get_note_activity(db: Session, note_id: int, limit: int = 50) -> list[dict]:
         }
         for log, email in results
     ]
+    return paginate(rows, limit, _log_key)
 
-def get_user_activity(db: Session, user_id: int, limit: int = 50) -> list[dict]:
-    """Get activity logs for a specific user."""
+def get_user_activity(db: Session, user_id: int, limit: int = 50, cursor: str | None = None) -> Page:
+    """Get activity logs for a specific user, newest first."""
+    activity_sink.flush()  # read your own writes
     stmt = (
         select(ActivityLog, Note.title)
         .outerjoin(Note, ActivityLog.note_id == Note.id)
         .where(ActivityLog.user_id == user_id)
-        .order_by(ActivityLog.timestamp.desc())
-        .limit(limit)
+        .order_by(ActivityLog.timestamp.desc(), ActivityLog.id.desc())
     )
-    results = db.execute(stmt).all()
+    if cursor:
+        stmt = stmt.where(seek(db, (ActivityLog.timestamp, ActivityLog.id), cursor))
+    results = db.execute(stmt.limit(limit + 1)).all()
     
-    return [
+    rows = [
         {
             "id": log.id,
             "user_id": log.user_id,
@@ -71,3 +91,31 @@ def get_user_activity(db: Session, user_id: int, limit: int = 50) -> list[dict]:
         }
         for log, title in results
     ]
+    return paginate(rows, limit, _log_key)
+
+def get_note_stats(db: Session, note_id: int, days: int = 30) -> dict:
+    """Action counts for a note over the last ``days`` days (UTC), in total and
+    per day. Read from the rollup, never from the raw log."""
+    activity_sink.flush()  # read your own writes
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    window = (ActivityRollup.note_id == note_id, ActivityRollup.day >= since)
+    results = db.execute(
+        select(ActivityRollup.day, ActivityRollup.action, func.sum(ActivityRollup.count))
+        .where(*window)
+        .group_by(ActivityRollup.day, ActivityRollup.action)
+        .order_by(ActivityRollup.day)
+    ).all()
+    unique_users = db.scalar(select(func.count(distinct(ActivityRollup.user_id))).where(*window))
+
+    totals: dict[str, int] = {}
+    daily: dict = {}
+    for day, action, count in results:
+        daily.setdefault(day, {})[action.value] = count
+        totals[action.value] = totals.get(action.value, 0) + count
+    return {
+        "note_id": note_id,
+        "since": since,
+        "unique_users": unique_users,
+        "totals": totals,
+        "daily": [{"day": day, "counts": counts} for day, counts in daily.items()],
+    }
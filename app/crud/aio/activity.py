@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.activity import record_activity
+from app.db.async_session import sync_engine_for
+from app.models.activity_log import ActionType
+
+def log_activity(
+    db: AsyncSession,
+    user_id: int,
+    action: ActionType,
+    note_id: int | None = None,
+    details: str | None = None
+) -> None:
+    """Log an activity. Buffered, so it never waits on the database; the sink
+    flushes through a sync engine on the same database."""
+    record_activity(sync_engine_for(db), user_id, action, note_id, details)
@@ -0,0 +1,14 @@
+"""Async access checks; the sync implementations run via ``AsyncSession.run_sync``."""
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import collaborator as collab_crud
+from app.models.note import Note
+
+async def get_note_with_access(db: AsyncSession, note_id: int, user_id: int, load_content: bool = True) -> tuple[Note, str]:
+    return await db.run_sync(collab_crud.get_note_with_access, note_id, user_id, load_content)
+
+async def require_edit_access(db: AsyncSession, note_id: int, user_id: int) -> Note:
+    return await db.run_sync(collab_crud.require_edit_access, note_id, user_id)
+
+async def require_owner(db: AsyncSession, note_id: int, user_id: int) -> Note:
+    return await db.run_sync(collab_crud.require_owner, note_id, user_id)
@@ -0,0 +1,32 @@
+"""Async note CRUD.
+
+Each call runs the sync implementation from ``app.crud.note`` through
+``AsyncSession.run_sync``: the ORM code runs in a greenlet while every
+statement awaits the async driver, so no worker thread is held.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import note as note_crud
+from app.models.note import Note
+from app.utils.pagination import Page
+
+async def create_note(db: AsyncSession, owner_id: int, title: str, content: str) -> Note:
+    return await db.run_sync(note_crud.create_note, owner_id, title, content)
+
+async def list_notes(db: AsyncSession, owner_id: int, q: str | None = None, limit: int = 50, cursor: str | None = None, summary: bool = False) -> Page:
+    return await db.run_sync(note_crud.list_notes, owner_id, q, limit, cursor, summary)
+
+async def list_notes_etag(db: AsyncSession, owner_id: int, q: str | None = None, limit: int = 50, cursor: str | None = None, summary: bool = False) -> str:
+    return await db.run_sync(note_crud.list_notes_etag, owner_id, q, limit, cursor, summary)
+
+async def list_shared_notes(db: AsyncSession, user_id: int, limit: int = 50, cursor: str | None = None, summary: bool = False) -> Page:
+    return await db.run_sync(note_crud.list_shared_notes, user_id, limit, cursor, summary)
+
+async def search_notes(db: AsyncSession, user_id: int, q: str, limit: int = 50, cursor: str | None = None, summary: bool = False) -> Page:
+    return await db.run_sync(note_crud.search_notes, user_id, q, limit, cursor, summary)
+
+async def update_note(db: AsyncSession, note: Note, user_id: int, title: str | None, content: str | None) -> Note:
+    return await db.run_sync(note_crud.update_note, note, user_id, title, content)
+
+async def delete_note(db: AsyncSession, note: Note, user_id: int) -> None:
+    await db.run_sync(note_crud.delete_note, note, user_id)
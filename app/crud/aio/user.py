@@ -0,0 +1,6 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+
+async def get_user(db: AsyncSession, user_id: int) -> User | None:
+    return await db.get(User, user_id)
@@ -1,28 +1,51 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import select
 from fastapi import HTTPException
 
+from app.core.cache import LRUCache
+from app.core.config import settings
 from app.models.note import Note
 from app.models.user import User
 from app.models.collaborator import NoteCollaborator, CollaboratorRole
 
-def get_note_with_access(db: Session, note_id: int, user_id: int) -> tuple[Note, str]:
-    """Get a note if user has access. Returns (note, role) where role is 'owner', 'editor', or 'viewer'."""
-    note = db.get(Note, note_id)
+NO_ACCESS = "none"
+
+# (note_id, user_id) -> 'editor' | 'viewer' | NO_ACCESS. Ownership is read from
+# the loaded note itself, so only collaborator lookups are cached.
+access_cache = LRUCache(settings.ACL_CACHE_SIZE)
+
+def invalidate_access(note_id: int, user_id: int | None = None) -> None:
+    """Forget cached roles for one collaborator, or for every user of a note."""
+    if user_id is not None:
+        access_cache.pop((note_id, user_id))
+    else:
+        access_cache.pop_where(lambda key, _: key[0] == note_id)
+
+def get_note_with_access(db: Session, note_id: int, user_id: int, load_content: bool = True) -> tuple[Note, str]:
+    """Get a note if user has access. Returns (note, role) where role is 'owner', 'editor', or 'viewer'.
+
+    With ``load_content=False`` the content column is deferred, for callers that
+    only need the access check or the note's ETag.
+    """
+    note = db.get(Note, note_id, options=None if load_content else [defer(Note.content)])
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
     if note.owner_id == user_id:
         return note, "owner"
     
-    collab = db.scalar(
-        select(NoteCollaborator).where(
-            NoteCollaborator.note_id == note_id,
-            NoteCollaborator.user_id == user_id
+    role = access_cache.get((note_id, user_id))
+    if role is None:
+        collab_role = db.scalar(
+            select(NoteCollaborator.role).where(
+                NoteCollaborator.note_id == note_id,
+                NoteCollaborator.user_id == user_id
+            )
         )
-    )
-    if collab:
-        return note, collab.role.value
+        role = collab_role.value if collab_role else NO_ACCESS
+        access_cache.set((note_id, user_id), role)
+    if role != NO_ACCESS:
+        return note, role
     
     raise HTTPException(status_code=403, detail="Access denied")
 
@@ -64,6 +87,7 @@ def add_collaborator(db: Session, note_id: int, owner_id: int, email: str, role:
         existing.role = CollaboratorRole(role)
         db.commit()
         db.refresh(existing)
+        invalidate_access(note_id, user.id)
         return existing
     
     collab = NoteCollaborator(
@@ -74,6 +98,7 @@ def add_collaborator(db: Session, note_id: int, owner_id: int, email: str, role:
     db.add(collab)
     db.commit()
     db.refresh(collab)
+    invalidate_access(note_id, user.id)
     return collab
 
 def remove_collaborator(db: Session, note_id: int, owner_id: int, user_id: int) -> None:
@@ -91,10 +116,11 @@ def remove_collaborator(db: Session, note_id: int, owner_id: int, user_id: int)
     
     db.delete(collab)
     db.commit()
+    invalidate_access(note_id, user_id)
 
 def list_collaborators(db: Session, note_id: int, user_id: int) -> list[dict]:
     """List all collaborators of a note."""
-    note, _ = get_note_with_access(db, note_id, user_id)
+    get_note_with_access(db, note_id, user_id, load_content=False)
     
     stmt = (
         select(NoteCollaborator, User.email)
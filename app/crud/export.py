@@ -0,0 +1,151 @@
+"""Streaming export of a user's notes, version history and collaborators.
+
+Records are read with ``yield_per`` (a server-side cursor on PostgreSQL) and
+serialized one at a time, so memory use doesn't grow with the size of the
+account. Each line of the NDJSON output is one record tagged with its
+``type`` ("note", "version" or "collaborator"); the zip archive holds the same
+lines split into one file per type.
+
+The generators open their own session: the request's session is closed
+before a streaming response starts sending.
+"""
+import io
+import json
+import zipfile
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.collaborator import NoteCollaborator
+from app.models.note import Note
+from app.models.note_version import NoteVersion
+from app.models.user import User
+from app.utils.delta import apply_delta
+
+EXPORT_BATCH_SIZE = 500
+
+
+def _notes(db: Session, owner_id: int) -> Iterator[dict]:
+    stmt = select(Note).where(Note.owner_id == owner_id).order_by(Note.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    for note in db.scalars(stmt):
+        yield {
+            "type": "note",
+            "id": note.id,
+            "title": note.title,
+            "content": note.content,
+            "current_version": note.current_version,
+            "created_at": note.created_at,
+            "updated_at": note.updated_at,
+        }
+
+
+def _versions(db: Session, owner_id: int) -> Iterator[dict]:
+    stmt = (
+        select(NoteVersion)
+        .join(Note, Note.id == NoteVersion.note_id)
+        .where(Note.owner_id == owner_id)
+        .order_by(NoteVersion.note_id, NoteVersion.version_number)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    # a delta is always based on the newest keyframe stored before it, so in
+    # version order only the last keyframe seen has to be kept around
+    keyframe = (None, None, None)  # note_id, version_number, content
+    for v in db.scalars(stmt):
+        if v.content_delta is None:
+            content = v.content_snapshot
+            keyframe = (v.note_id, v.version_number, content)
+        elif keyframe[:2] == (v.note_id, v.base_version):
+            content = apply_delta(keyframe[2], v.content_delta)
+        else:  # history edited by hand; fall back to a lookup
+            base = db.scalar(
+                select(NoteVersion.content_snapshot).where(
+                    NoteVersion.note_id == v.note_id, NoteVersion.version_number == v.base_version
+                )
+            )
+            content = apply_delta(base, v.content_delta)
+        yield {
+            "type": "version",
+            "note_id": v.note_id,
+            "version_number": v.version_number,
+            "title": v.title_snapshot,
+            "content": content,
+            "editor_user_id": v.editor_user_id,
+            "created_at": v.created_at,
+        }
+
+
+def _collaborators(db: Session, owner_id: int) -> Iterator[dict]:
+    stmt = (
+        select(NoteCollaborator.note_id, NoteCollaborator.role, NoteCollaborator.created_at, User.id, User.email)
+        .join(Note, Note.id == NoteCollaborator.note_id)
+        .join(User, User.id == NoteCollaborator.user_id)
+        .where(Note.owner_id == owner_id)
+        .order_by(NoteCollaborator.note_id, NoteCollaborator.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for note_id, role, created_at, user_id, email in db.execute(stmt):
+        yield {
+            "type": "collaborator",
+            "note_id": note_id,
+            "user_id": user_id,
+            "email": email,
+            "role": role.value,
+            "created_at": created_at,
+        }
+
+
+def _sections(bind: Engine, owner_id: int, versions: bool, collaborators: bool) -> Iterator[tuple[str, Iterator[dict]]]:
+    with Session(bind) as db:
+        yield "notes", _notes(db, owner_id)
+        if versions:
+            yield "versions", _versions(db, owner_id)
+        if collaborators:
+            yield "collaborators", _collaborators(db, owner_id)
+
+
+def _line(record: dict) -> bytes:
+    return (json.dumps(record, default=lambda v: v.isoformat()) + "\n").encode()
+
+
+def export_ndjson(bind: Engine, owner_id: int, versions: bool = False, collaborators: bool = False) -> Iterator[bytes]:
+    lines = []
+    for _, records in _sections(bind, owner_id, versions, collaborators):
+        for record in records:
+            lines.append(_line(record))
+            if len(lines) == EXPORT_BATCH_SIZE:
+                yield b"".join(lines)
+                lines = []
+    yield b"".join(lines)
+
+
+class _Chunks(io.RawIOBase):
+    """Write-only, unseekable sink that hands back what has been written so far."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        return len(b)
+
+    def take(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def export_zip(bind: Engine, owner_id: int, versions: bool = False, collaborators: bool = False) -> Iterator[bytes]:
+    sink = _Chunks()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, records in _sections(bind, owner_id, versions, collaborators):
+            with archive.open(f"{name}.ndjson", "w") as f:
+                for i, record in enumerate(records, 1):
+                    f.write(_line(record))
+                    if i % EXPORT_BATCH_SIZE == 0:
+                        yield sink.take()
+            yield sink.take()
+    yield sink.take()
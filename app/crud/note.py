@@ -1,57 +1,220 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, or_
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session, load_only, with_expression
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import select, func, or_, delete, insert, update
 from fastapi import HTTPException
 
+from app.core.cache import LRUCache
+from app.core.config import settings
+
 from app.models.note import Note
 from app.models.note_version import NoteVersion
 from app.models.collaborator import NoteCollaborator
-from app.crud.collaborator import get_note_with_access, require_edit_access
+from app.models.activity_log import ActivityLog, ActivityRollup
+from app.crud.collaborator import NO_ACCESS, invalidate_access
+from app.db import search
+from app.utils.pagination import Page, paginate, seek
+from app.utils.delta import make_delta, apply_delta
+from app.utils.diff import diff_lines, line_ops, unified
+from app.utils.etag import make_etag
+from app.utils.textops import apply_text_ops, content_hash
+
+# (note_id, note created_at, from, to, format) -> diff; versions never change, and
+# diffs against the current note are keyed by its version counter
+diff_cache = LRUCache(settings.VERSION_DIFF_CACHE_SIZE)
+
+def invalidate_diffs(note_id: int) -> None:
+    diff_cache.pop_where(lambda key, _: key[0] == note_id)
 
 def _require_owner(note: Note, user_id: int):
     if note.owner_id != user_id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
+def _latest_keyframes(db: Session, note_ids: list[int]) -> dict[int, tuple[int, str]]:
+    """note_id -> (version_number, content) of each note's newest keyframe."""
+    if settings.VERSION_KEYFRAME_INTERVAL <= 1 or not note_ids:
+        return {}
+    latest = (
+        select(NoteVersion.note_id, func.max(NoteVersion.version_number).label("version_number"))
+        .where(NoteVersion.note_id.in_(note_ids), NoteVersion.content_delta.is_(None))
+        .group_by(NoteVersion.note_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(NoteVersion.note_id, NoteVersion.version_number, NoteVersion.content_snapshot).join(
+            latest,
+            (NoteVersion.note_id == latest.c.note_id) & (NoteVersion.version_number == latest.c.version_number),
+        )
+    ).all()
+    return {note_id: (number, content) for note_id, number, content in rows}
+
+def _snapshot(
+    db: Session, note: Note, version_number: int, user_id: int, keyframes: dict[int, tuple[int, str]] | None = None
+) -> NoteVersion:
+    """Build the version row for the note's current state.
+
+    Every VERSION_KEYFRAME_INTERVAL versions a full keyframe is stored; the
+    versions in between keep a delta against the latest keyframe. Callers
+    snapshotting many notes pass ``keyframes`` (see ``_latest_keyframes``),
+    which is updated when a new keyframe is stored.
+    """
+    version = NoteVersion(
+        note_id=note.id,
+        version_number=version_number,
+        title_snapshot=note.title,
+        editor_user_id=user_id,
+    )
+    if keyframes is None:
+        keyframes = _latest_keyframes(db, [note.id])
+    keyframe = keyframes.get(note.id)
+    if keyframe is not None and version_number - keyframe[0] < settings.VERSION_KEYFRAME_INTERVAL:
+        delta = make_delta(keyframe[1], note.content)
+        if len(delta) < len(note.content):
+            version.content_delta = delta
+            version.base_version = keyframe[0]
+            return version
+    version.content_snapshot = note.content
+    keyframes[note.id] = (version_number, note.content)
+    return version
+
+def _materialize(db: Session, versions: list[NoteVersion]) -> list[NoteVersion]:
+    """Fill in content_snapshot of delta-encoded versions (without marking them dirty)."""
+    pending = [v for v in versions if v.content_delta is not None and v.content_snapshot is None]
+    if not pending:
+        return versions
+    keyframes = {v.version_number: v.content_snapshot for v in versions if v.content_delta is None}
+    missing = {v.base_version for v in pending} - keyframes.keys()
+    if missing:
+        rows = db.execute(
+            select(NoteVersion.version_number, NoteVersion.content_snapshot).where(
+                NoteVersion.note_id == pending[0].note_id,
+                NoteVersion.version_number.in_(missing),
+            )
+        ).all()
+        keyframes.update({number: content for number, content in rows})
+    for v in pending:
+        set_committed_value(v, "content_snapshot", apply_delta(keyframes[v.base_version], v.content_delta))
+    return versions
+
 def create_note(db: Session, owner_id: int, title: str, content: str) -> Note:
     note = Note(owner_id=owner_id, title=title, content=content)
     db.add(note)
+    db.flush()
+    search.index_note(db, note.id, note.title, note.content)
     db.commit()
     db.refresh(note)
     return note
 
-def list_notes(db: Session, owner_id: int, q: str | None = None) -> list[Note]:
-    stmt = select(Note).where(Note.owner_id == owner_id).order_by(Note.updated_at.desc())
+def _note_key(note: Note) -> tuple:
+    return note.updated_at, note.id
+
+def note_etag(note: Note) -> str:
+    return make_etag(note.id, note.updated_at)
+
+def notes_page_etag(page: Page, *extra) -> str:
+    """ETag of a page of notes (or of rows carrying their id and updated_at)."""
+    return make_etag(*(_note_key(n) for n in page.items), page.next_cursor, *extra)
+
+def _summary_options(db: Session, preview=None) -> tuple:
+    """Load notes without their content. The preview (or a search snippet) is
+    computed by the database and the length is stored, so the body is never
+    transferred."""
+    if preview is None:
+        preview = search.preview_column(db, Note.id, Note.content, settings.NOTE_PREVIEW_LENGTH)
+    return (
+        load_only(Note.id, Note.title, Note.content_length, Note.owner_id, Note.created_at, Note.updated_at),
+        with_expression(Note.preview, preview),
+    )
+
+def _list_notes_stmt(db: Session, owner_id: int, q: str | None, cursor: str | None, summary: bool = False):
+    stmt = select(Note).where(Note.owner_id == owner_id).order_by(Note.updated_at.desc(), Note.id.desc())
+    preview = None
     if q:
-        like = f"%{q}%"
-        stmt = stmt.where((Note.title.ilike(like)) | (Note.content.ilike(like)))
-    return list(db.scalars(stmt).all())
+        fts = search.match_subquery(db, q, snippet=summary)
+        if fts is not None:
+            stmt = stmt.join(fts, fts.c.note_id == Note.id)
+            if summary:
+                preview = search.snippet_column(db, fts, q, Note.content)
+        else:
+            stmt = stmt.where(search.ilike_clause(Note.title, Note.content, q))
+    if summary:
+        stmt = stmt.options(*_summary_options(db, preview))
+    if cursor:
+        stmt = stmt.where(seek(db, (Note.updated_at, Note.id), cursor))
+    return stmt
+
+def list_notes(
+    db: Session, owner_id: int, q: str | None = None, limit: int = 50, cursor: str | None = None, summary: bool = False
+) -> Page:
+    stmt = _list_notes_stmt(db, owner_id, q, cursor, summary)
+    rows = list(db.scalars(stmt.limit(limit + 1)).all())
+    return paginate(rows, limit, _note_key)
+
+def list_notes_etag(
+    db: Session, owner_id: int, q: str | None = None, limit: int = 50, cursor: str | None = None, summary: bool = False
+) -> str:
+    """Same page as ``list_notes``, but only reads (id, updated_at) to tag it."""
+    stmt = _list_notes_stmt(db, owner_id, q, cursor).with_only_columns(Note.id, Note.updated_at)
+    rows = db.execute(stmt.limit(limit + 1)).all()
+    return notes_page_etag(paginate(rows, limit, _note_key), summary)
 
-def list_shared_notes(db: Session, user_id: int) -> list[dict]:
+def list_shared_notes(db: Session, user_id: int, limit: int = 50, cursor: str | None = None, summary: bool = False) -> Page:
     """List notes shared with the user."""
     stmt = (
         select(Note, NoteCollaborator.role)
         .join(NoteCollaborator, Note.id == NoteCollaborator.note_id)
         .where(NoteCollaborator.user_id == user_id)
-        .order_by(Note.updated_at.desc())
+        .order_by(Note.updated_at.desc(), Note.id.desc())
     )
-    results = db.execute(stmt).all()
-    return [{"note": note, "role": role} for note, role in results]
+    if summary:
+        stmt = stmt.options(*_summary_options(db))
+    if cursor:
+        stmt = stmt.where(seek(db, (Note.updated_at, Note.id), cursor))
+    results = db.execute(stmt.limit(limit + 1)).all()
+    rows = [{"note": note, "role": role} for note, role in results]
+    return paginate(rows, limit, lambda r: _note_key(r["note"]))
 
-def search_notes(db: Session, user_id: int, q: str) -> list[Note]:
-    """Search notes by title or content (owned + shared)."""
-    like = f"%{q}%"
-    
+def search_notes(
+    db: Session, user_id: int, q: str, limit: int = 50, cursor: str | None = None, summary: bool = False
+) -> Page:
+    """Search notes by title or content (owned + shared), best matches first.
+
+    With ``summary=True`` each note's preview is a snippet around the matches.
+    """
     # Get IDs of notes shared with user
     shared_note_ids = select(NoteCollaborator.note_id).where(NoteCollaborator.user_id == user_id)
-    
-    stmt = (
-        select(Note)
-        .where(
-            or_(Note.owner_id == user_id, Note.id.in_(shared_note_ids)),
-            or_(Note.title.ilike(like), Note.content.ilike(like))
+    access = or_(Note.owner_id == user_id, Note.id.in_(shared_note_ids))
+
+    fts = search.match_subquery(db, q, snippet=summary)
+    if fts is None:
+        stmt = (
+            select(Note)
+            .where(access, search.ilike_clause(Note.title, Note.content, q))
+            .order_by(Note.updated_at.desc(), Note.id.desc())
         )
-        .order_by(Note.updated_at.desc())
+        if summary:
+            stmt = stmt.options(*_summary_options(db))
+        if cursor:
+            stmt = stmt.where(seek(db, (Note.updated_at, Note.id), cursor))
+        rows = list(db.scalars(stmt.limit(limit + 1)).all())
+        return paginate(rows, limit, _note_key)
+
+    stmt = (
+        select(Note, fts.c.score)
+        .join(fts, fts.c.note_id == Note.id)
+        .where(access)
+        .order_by(fts.c.score.desc(), Note.id.desc())
     )
-    return list(db.scalars(stmt).all())
+    if summary:
+        stmt = stmt.options(*_summary_options(db, search.snippet_column(db, fts, q, Note.content)))
+    if cursor:
+        stmt = stmt.where(seek(db, (fts.c.score, Note.id), cursor))
+    results = db.execute(stmt.limit(limit + 1)).all()
+    page = paginate(list(results), limit, lambda r: (r.score, r.Note.id))
+    return Page([r.Note for r in page.items], page.next_cursor)
 
 def get_note(db: Session, note_id: int) -> Note:
     note = db.get(Note, note_id)
@@ -59,44 +222,263 @@ def get_note(db: Session, note_id: int) -> Note:
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
-def update_note(db: Session, note_id: int, user_id: int, title: str | None, content: str | None) -> Note:
-    note = get_note(db, note_id)
-    # Access check is done in the route via require_edit_access
+def _apply_edit(db: Session, note: Note, title: str | None, content: str | None, expected_version: int | None = None) -> int | None:
+    """Apply an edit and take the note's next version number in one UPDATE.
 
-    # determine next version number
-    max_version = db.scalar(select(func.max(NoteVersion.version_number)).where(NoteVersion.note_id == note_id))
-    next_version = (max_version or 0) + 1
+    The counter is incremented by the database (the row lock serializes
+    concurrent editors), so two writers never get the same version number.
+    With ``expected_version`` the edit only applies if the counter still has
+    that value; None is returned otherwise.
+    ``note`` keeps its previous state for the snapshot; refresh it after commit.
+    """
+    changes = {"title": title, "content": content}
+    if content is not None:
+        changes["content_length"] = len(content)
+    stmt = update(Note).where(Note.id == note.id)
+    if expected_version is not None:
+        stmt = stmt.where(Note.current_version == expected_version)
+    return db.execute(
+        stmt
+        .values(current_version=Note.current_version + 1, **{k: v for k, v in changes.items() if v is not None})
+        .returning(Note.current_version)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
 
-    # store snapshot BEFORE applying changes (snapshot = old state)
-    version = NoteVersion(
-        note_id=note_id,
-        version_number=next_version,
-        title_snapshot=note.title,
-        content_snapshot=note.content,
-        editor_user_id=user_id,
+def _version_conflict(db: Session, note: Note) -> HTTPException:
+    db.rollback()  # also expires note, so the counter below is read fresh
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Note has changed since the base version", "current_version": note.current_version},
     )
-    db.add(version)
 
-    # apply updates
-    if title is not None:
-        note.title = title
-    if content is not None:
-        note.content = content
+def update_note(
+    db: Session, note: Note, user_id: int, title: str | None, content: str | None, expected_version: int | None = None
+) -> Note:
+    # Access check is done in the route via require_edit_access, which also loaded the note
+    next_version = _apply_edit(db, note, title, content, expected_version)
+    if next_version is None:
+        raise _version_conflict(db, note)
+
+    # store snapshot BEFORE applying changes (snapshot = old state)
+    db.add(_snapshot(db, note, next_version, user_id))
+    search.index_note(db, note.id, title if title is not None else note.title, content if content is not None else note.content)
 
     db.commit()
     db.refresh(note)
     return note
 
-def delete_note(db: Session, note_id: int, user_id: int) -> None:
-    note = get_note(db, note_id)
+def patch_note(
+    db: Session, note: Note, user_id: int, base_version: int | None, base_hash: str | None, title: str | None, ops: list
+) -> Note:
+    """Apply text ops to the note's content if it is still at the client's base.
+
+    The base is checked against the loaded note, and again atomically by the
+    UPDATE, so an edit committed in between is reported as a conflict too.
+    """
+    # Access check is done in the route via require_edit_access, which also loaded the note
+    base = note.current_version
+    if (base_version is not None and base_version != base) or (
+        base_hash is not None and base_hash != content_hash(note.content)
+    ):
+        raise _version_conflict(db, note)
+    content = None
+    if ops:
+        try:
+            content = apply_text_ops(note.content, ops)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if not content:
+            raise HTTPException(status_code=422, detail="Content cannot be empty")
+    return update_note(db, note, user_id, title, content, expected_version=base)
+
+def delete_note(db: Session, note: Note, user_id: int) -> None:
     _require_owner(note, user_id)
+    note_id = note.id
+    search.unindex_note(db, note_id)
+    # not an ORM relationship: SQLite doesn't enforce the ON DELETE CASCADE
+    db.execute(delete(ActivityRollup).where(ActivityRollup.note_id == note_id))
     db.delete(note)
     db.commit()
+    invalidate_access(note_id)
+    invalidate_diffs(note_id)
+
+def apply_batch(db: Session, user_id: int, operations: list) -> list[dict]:
+    """Apply a list of create / update / delete operations in one transaction.
+
+    Access to every referenced note is checked with one query (which also
+    locks the rows and reads their version counters), and keyframes are read
+    once for the whole batch. The new rows are
+    flushed together. Operations that fail their check are reported (with the
+    status the single-note endpoint would return) and skipped; the rest are
+    committed at once.
+    """
+    ids = {op.id for op in operations if op.op != "create"}
+    notes: dict[int, Note] = {}
+    roles: dict[int, str] = {}
+    if ids:
+        # row locks keep current_version authoritative until the commit
+        rows = db.execute(
+            select(Note, NoteCollaborator.role)
+            .outerjoin(NoteCollaborator, (NoteCollaborator.note_id == Note.id) & (NoteCollaborator.user_id == user_id))
+            .where(Note.id.in_(ids))
+            .with_for_update(of=Note)
+        ).all()
+        for note, role in rows:
+            notes[note.id] = note
+            roles[note.id] = "owner" if note.owner_id == user_id else role.value if role else NO_ACCESS
+
+    updated_ids = list({op.id for op in operations if op.op == "update" and op.id in notes})
+    keyframes = _latest_keyframes(db, updated_ids)
+
+    results: list[dict] = []
+    snapshots: list[NoteVersion] = []
+    created: list[tuple[dict, Note]] = []
+    changed: dict[int, Note] = {}
+    deleted: set[int] = set()
+    for index, op in enumerate(operations):
+        result = {"index": index, "op": op.op, "id": op.id}
+        results.append(result)
+        if op.op == "create":
+            note = Note(owner_id=user_id, title=op.title, content=op.content)
+            db.add(note)
+            created.append((result, note))
+            result["status"] = 201
+            continue
+
+        note, role = notes.get(op.id), roles.get(op.id)
+        if note is None or op.id in deleted:
+            result.update(status=404, detail="Note not found")
+        elif role == NO_ACCESS:
+            result.update(status=403, detail="Access denied")
+        elif op.op == "update" and role == "viewer":
+            result.update(status=403, detail="Edit access required")
+        elif op.op == "delete" and role != "owner":
+            result.update(status=403, detail="Only the owner can perform this action")
+        elif op.op == "update":
+            note.current_version += 1
+            snapshots.append(_snapshot(db, note, note.current_version, user_id, keyframes))
+            if op.title is not None:
+                note.title = op.title
+            if op.content is not None:
+                note.content = op.content
+            changed[note.id] = note
+            result["status"] = 200
+        else:
+            deleted.add(note.id)
+            changed.pop(note.id, None)
+            result["status"] = 204
+
+    db.flush()
+    if snapshots:
+        # plain executemany: unlike a flush, this doesn't fetch back each version's id
+        columns = ("note_id", "version_number", "title_snapshot", "content_snapshot", "content_delta", "base_version", "editor_user_id")
+        db.execute(insert(NoteVersion), [{c: getattr(v, c) for c in columns} for v in snapshots])
+    for result, note in created:
+        result["id"] = note.id
+        changed[note.id] = note
+    search.index_notes(db, [(note.id, note.title, note.content) for note in changed.values()])
+
+    if deleted:
+        # Bulk deletes instead of ORM cascades, which would load every note's versions
+        search.unindex_notes(db, list(deleted))
+        db.execute(update(ActivityLog).where(ActivityLog.note_id.in_(deleted)).values(note_id=None))
+        db.execute(delete(ActivityRollup).where(ActivityRollup.note_id.in_(deleted)))
+        db.execute(delete(NoteVersion).where(NoteVersion.note_id.in_(deleted)))
+        db.execute(delete(NoteCollaborator).where(NoteCollaborator.note_id.in_(deleted)))
+        db.execute(delete(Note).where(Note.id.in_(deleted)))
+    db.commit()
+    for note_id in deleted:
+        invalidate_access(note_id)
+        invalidate_diffs(note_id)
+    return results
 
-def list_versions(db: Session, note_id: int, user_id: int) -> list[NoteVersion]:
+def list_versions(db: Session, note_id: int, user_id: int, limit: int = 50, cursor: str | None = None) -> Page:
     # Access check is done in the route
     stmt = select(NoteVersion).where(NoteVersion.note_id == note_id).order_by(NoteVersion.version_number.desc())
-    return list(db.scalars(stmt).all())
+    if cursor:
+        stmt = stmt.where(seek(db, (NoteVersion.version_number,), cursor))
+    rows = list(db.scalars(stmt.limit(limit + 1)).all())
+    page = paginate(rows, limit, lambda v: (v.version_number,))
+    return Page(_materialize(db, page.items), page.next_cursor)
+
+def versions_etag(db: Session, note_id: int, limit: int = 50, cursor: str | None = None) -> str:
+    # versions are immutable, so the newest version number (and the count, in
+    # case old versions are pruned) identifies the list
+    latest, count = db.execute(
+        select(func.max(NoteVersion.version_number), func.count()).where(NoteVersion.note_id == note_id)
+    ).one()
+    return make_etag(note_id, latest, count, limit, cursor)
+
+def plan_version_thinning(versions: list[tuple], now: datetime, tiers: list[tuple[int, int]] | None = None) -> set[int]:
+    """Version numbers to keep out of ``versions`` ((version_number, created_at, base_version) tuples).
+
+    Versions younger than the first tier's age are all kept. Older ones fall in
+    time buckets of the tier for their age (VERSION_RETENTION_TIERS) and only
+    the newest of each bucket survives. The newest version is always kept, and
+    so is every keyframe a surviving delta is based on.
+    """
+    tiers = sorted(settings.VERSION_RETENTION_TIERS if tiers is None else tiers)
+    if not tiers:
+        return {number for number, _, _ in versions}
+    ages = [age for age, _ in tiers]
+    keep: set[int] = set()
+    buckets: set[tuple[int, int]] = set()
+    for number, created_at, _ in sorted(versions, key=lambda v: v[0], reverse=True):
+        if created_at.tzinfo is None:  # SQLite
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        tier = bisect_right(ages, (now - created_at).total_seconds()) - 1
+        if tier < 0:
+            keep.add(number)
+            continue
+        bucket = (tier, int(created_at.timestamp() // max(tiers[tier][1], 1)))
+        if bucket not in buckets:
+            buckets.add(bucket)
+            keep.add(number)
+    if versions:
+        keep.add(max(number for number, _, _ in versions))
+    keep |= {base for number, _, base in versions if number in keep and base is not None}
+    return keep
+
+def compact_versions(
+    db: Session, note_ids: list[int], dry_run: bool = False, now: datetime | None = None
+) -> dict[int, tuple[list[int], list[int]]]:
+    """Thin the version history of ``note_ids`` (see ``plan_version_thinning``).
+
+    Returns note_id -> (kept, removed) version numbers. Survivors keep their
+    version_number. Only version metadata is read, and the removed rows are
+    deleted by id in one transaction per call.
+    """
+    now = now or datetime.now(timezone.utc)
+    rows = db.execute(
+        select(NoteVersion.id, NoteVersion.note_id, NoteVersion.version_number, NoteVersion.created_at, NoteVersion.base_version)
+        .where(NoteVersion.note_id.in_(note_ids))
+    ).all()
+    by_note = defaultdict(list)
+    for row in rows:
+        by_note[row.note_id].append(row)
+
+    plans = {}
+    doomed = []
+    for note_id, versions in by_note.items():
+        keep = plan_version_thinning([(v.version_number, v.created_at, v.base_version) for v in versions], now)
+        removed = [v for v in versions if v.version_number not in keep]
+        plans[note_id] = (sorted(keep), sorted(v.version_number for v in removed))
+        doomed += [v.id for v in removed]
+    if doomed and not dry_run:
+        for i in range(0, len(doomed), 1000):
+            db.execute(delete(NoteVersion).where(NoteVersion.id.in_(doomed[i:i + 1000])))
+        db.commit()
+        for note_id, (_, removed) in plans.items():
+            if removed:
+                invalidate_diffs(note_id)
+    return plans
+
+def compact_note_versions(db: Session, note: Note, user_id: int, dry_run: bool = True) -> dict:
+    # Access check is done in the route; only the owner may actually drop versions
+    if not dry_run:
+        _require_owner(note, user_id)
+    kept, removed = compact_versions(db, [note.id], dry_run=dry_run).get(note.id, ([], []))
+    return {"note_id": note.id, "dry_run": dry_run, "kept": kept, "removed": removed}
 
 def get_version(db: Session, note_id: int, version_number: int, user_id: int) -> NoteVersion:
     # Access check is done in the route
@@ -107,28 +489,50 @@ def get_version(db: Session, note_id: int, version_number: int, user_id: int) ->
     v = db.scalar(stmt)
     if not v:
         raise HTTPException(status_code=404, detail="Version not found")
+    _materialize(db, [v])
     return v
 
-def restore_version(db: Session, note_id: int, version_number: int, user_id: int) -> Note:
-    note = get_note(db, note_id)
+def diff_versions(db: Session, note: Note, from_version: int, to_version: int | None, format: str) -> dict:
+    """Diff of the content between two versions, or between a version and the
+    current note when ``to_version`` is None. Served from ``diff_cache`` when possible."""
     # Access check is done in the route
+    key = (note.id, note.created_at, from_version, to_version or ("current", note.current_version), format)
+    cached = diff_cache.get(key)
+    if cached is not None:
+        return cached
 
-    v = get_version(db, note_id, version_number, user_id)
+    old = get_version(db, note.id, from_version, note.owner_id)
+    new = note if to_version is None else get_version(db, note.id, to_version, note.owner_id)
+    a = old.content_snapshot.splitlines(keepends=True)
+    b = (new.content if to_version is None else new.content_snapshot).splitlines(keepends=True)
+    opcodes, exact = diff_lines(a, b, settings.VERSION_DIFF_MAX_EDITS)
+    result = {
+        "note_id": note.id,
+        "from_version": from_version,
+        "to_version": to_version,
+        "format": format,
+        "exact": exact,
+        "added": sum(j2 - j1 for tag, _, _, j1, j2 in opcodes if tag != "equal"),
+        "removed": sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag != "equal"),
+    }
+    if format == "unified":
+        to_name = "current" if to_version is None else f"version {to_version}"
+        result["unified"] = unified(a, b, opcodes, f"version {from_version}", to_name)
+    else:
+        result["ops"] = line_ops(b, opcodes)
+    diff_cache.set(key, result)
+    return result
 
-    # create a version snapshot before restore (so restore action is also reversible)
-    max_version = db.scalar(select(func.max(NoteVersion.version_number)).where(NoteVersion.note_id == note_id))
-    next_version = (max_version or 0) + 1
-    db.add(NoteVersion(
-        note_id=note_id,
-        version_number=next_version,
-        title_snapshot=note.title,
-        content_snapshot=note.content,
-        editor_user_id=user_id,
-    ))
+def restore_version(db: Session, note: Note, version_number: int, user_id: int) -> Note:
+    # Access check is done in the route via require_edit_access, which also loaded the note
+    note_id = note.id
+
+    v = get_version(db, note_id, version_number, user_id)
 
-    # restore
-    note.title = v.title_snapshot
-    note.content = v.content_snapshot
+    # restore, with a snapshot of the current state (so restore action is also reversible)
+    next_version = _apply_edit(db, note, v.title_snapshot, v.content_snapshot)
+    db.add(_snapshot(db, note, next_version, user_id))
+    search.index_note(db, note.id, v.title_snapshot, v.content_snapshot)
 
     db.commit()
     db.refresh(note)
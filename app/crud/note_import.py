@@ -0,0 +1,112 @@
+"""Bulk import of notes from NDJSON, the format written by GET /notes/export.
+
+Lines are validated as they are read and buffered up to NOTE_IMPORT_CHUNK_SIZE
+notes, which are then inserted (and indexed for search) in one transaction.
+Chunks that were committed stay imported if a later one fails. Records of
+other types ("version", "collaborator") are counted as skipped. At most
+NOTE_IMPORT_MAX_ERRORS errors are listed; all of them are counted.
+"""
+import json
+import logging
+import zipfile
+from typing import BinaryIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import search
+from app.models.note import Note
+from app.schemas.note import NoteCreate
+from app.utils.ndjson import file_lines
+
+logger = logging.getLogger(__name__)
+
+
+class NoteImporter:
+    def __init__(self, db: Session, owner_id: int):
+        self.db = db
+        self.owner_id = owner_id
+        self.lines = 0
+        self.imported = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+        self._pending: list[tuple[int, str | None, dict]] = []
+
+    def _error(self, lineno: int, source: str | None, detail: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.NOTE_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": lineno, "file": source, "detail": detail})
+
+    def add(self, line: bytes | None, lineno: int, source: str | None = None) -> bool:
+        """Validate one line (None for an overlong one). Returns True when a chunk is ready to flush."""
+        self.lines += 1
+        if line is None:
+            self._error(lineno, source, f"line longer than {settings.NOTE_IMPORT_MAX_LINE_BYTES} bytes")
+            return False
+        if not line.strip():
+            self.lines -= 1
+            return False
+        try:
+            record = json.loads(line)
+        except ValueError:
+            self._error(lineno, source, "invalid JSON")
+            return False
+        if not isinstance(record, dict):
+            self._error(lineno, source, "expected a JSON object")
+            return False
+        if record.get("type", "note") != "note":
+            self.skipped += 1
+            return False
+        try:
+            note = NoteCreate.model_validate(record)
+        except ValidationError as e:
+            err = e.errors()[0]
+            self._error(lineno, source, f"{'.'.join(map(str, err['loc']))}: {err['msg']}")
+            return False
+        self._pending.append((lineno, source, {"owner_id": self.owner_id, "title": note.title, "content": note.content}))
+        return len(self._pending) >= settings.NOTE_IMPORT_CHUNK_SIZE
+
+    def flush(self) -> None:
+        """Insert the buffered notes in one transaction."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        rows = [row for _, _, row in pending]
+        try:
+            ids = self.db.scalars(insert(Note).returning(Note.id, sort_by_parameter_order=True), rows).all()
+            search.index_notes(self.db, [(note_id, row["title"], row["content"]) for note_id, row in zip(ids, rows)])
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            logger.exception("Import chunk of %d notes failed", len(rows))
+            for lineno, source, _ in pending:
+                self._error(lineno, source, "could not be stored")
+        else:
+            self.imported += len(rows)
+
+    def add_file(self, f: BinaryIO, source: str | None = None) -> None:
+        for lineno, line in enumerate(file_lines(f, settings.NOTE_IMPORT_MAX_LINE_BYTES), 1):
+            if self.add(line, lineno, source):
+                self.flush()
+        self.flush()
+
+    def add_zip(self, f: BinaryIO) -> None:
+        """Import every ``*.ndjson`` member of a zip archive (raises zipfile.BadZipFile)."""
+        with zipfile.ZipFile(f) as archive:
+            for info in archive.infolist():
+                if info.filename.endswith(".ndjson"):
+                    with archive.open(info) as member:
+                        self.add_file(member, info.filename)
+
+    def result(self) -> dict:
+        return {
+            "lines": self.lines,
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
@@ -1,26 +1,45 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 
 from app.models.user import User
 from app.core.security import hash_password, verify_password
+from app.utils.pagination import Page, paginate, seek
 
-def create_user(db: Session, email: str, password: str) -> User:
-    existing = db.scalar(select(User).where(User.email == email))
-    if existing:
+def get_user_by_email(db: Session, email: str) -> User | None:
+    return db.scalar(select(User).where(User.email == email))
+
+def ensure_email_available(db: Session, email: str) -> None:
+    if get_user_by_email(db, email):
         raise HTTPException(status_code=409, detail="Email already registered")
 
-    user = User(email=email, hashed_password=hash_password(password))
+def create_user(db: Session, email: str, password: str | None = None, hashed_password: str | None = None) -> User:
+    """Create a user from a plain password, or from a hash computed by the caller."""
+    ensure_email_available(db, email)
+
+    user = User(email=email, hashed_password=hashed_password or hash_password(password))
     db.add(user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Email already registered")
     db.refresh(user)
     return user
 
 def authenticate(db: Session, email: str, password: str) -> User:
-    user = db.scalar(select(User).where(User.email == email))
+    user = get_user_by_email(db, email)
     if not user or not verify_password(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
     return user
+
+def list_users(db: Session, limit: int = 50, cursor: str | None = None) -> Page:
+    stmt = select(User).order_by(User.id)
+    if cursor:
+        stmt = stmt.where(seek(db, (User.id,), cursor, descending=False))
+    rows = list(db.scalars(stmt.limit(limit + 1)).all())
+    return paginate(rows, limit, lambda u: (u.id,))
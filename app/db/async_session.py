@@ -0,0 +1,72 @@
+"""Async engine and sessions (aiosqlite / asyncpg), used when DB_ASYNC is on.
+
+The async driver packages are only imported when the async engine is first
+created, so the default sync deployment doesn't need them installed.
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.metrics import instrument_engine
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker | None = None
+_sync_engines: dict[str, Engine] = {}
+
+
+def to_async_url(url: str) -> str:
+    """Map a sync database URL onto the matching async driver."""
+    parsed = make_url(url.replace("postgres://", "postgresql://", 1))
+    return parsed.set(drivername=_ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+def async_pool_options(url: str) -> dict:
+    # aiosqlite file databases get a NullPool, which takes no sizing arguments
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+
+
+def get_async_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            to_async_url(settings.DATABASE_URL), pool_pre_ping=True, **async_pool_options(settings.DATABASE_URL)
+        )
+        instrument_engine(_engine.sync_engine)
+    return _engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(bind=get_async_engine(), autoflush=False)
+    return _sessionmaker()
+
+
+def sync_engine_for(db: AsyncSession) -> Engine:
+    """Sync engine on the same database, for work done off the event loop
+    (e.g. the activity sink's background flushes)."""
+    url = db.get_bind().url
+    sync_url = url.set(drivername=url.get_backend_name())
+    key = sync_url.render_as_string(hide_password=False)
+    if key not in _sync_engines:
+        from app.db.session import engine
+        if key == make_url(settings.DATABASE_URL).render_as_string(hide_password=False):
+            _sync_engines[key] = engine
+        else:
+            connect_args = {"check_same_thread": False} if sync_url.get_backend_name() == "sqlite" else {}
+            _sync_engines[key] = create_engine(sync_url, connect_args=connect_args, pool_pre_ping=True)
+    return _sync_engines[key]
+
+
+async def dispose_async_engine() -> None:
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine, _sessionmaker = None, None
@@ -0,0 +1,109 @@
+"""Transparent compression of large text columns.
+
+``CompressedText`` stores values on SQLite as a BLOB with a one-byte format
+marker: ``RAW`` (UTF-8 as is) for values under CONTENT_COMPRESSION_MIN_BYTES
+or that don't shrink, ``ZLIB`` otherwise. Rows written before the column was
+compressed are still TEXT and are read as they are, so existing databases can
+be converted in the background (``compress_existing``) while the app runs.
+Values are only decompressed when the column is loaded; listings and access
+checks defer it.
+
+PostgreSQL already compresses large values itself (TOAST), and its full-text
+snippets need the text in SQL, so there the column stays plain TEXT.
+"""
+import zlib
+
+from sqlalchemy import LargeBinary, Text, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+RAW = b"\x00"
+ZLIB = b"\x01"
+
+COMPRESSED_DIALECTS = ("sqlite",)
+
+
+def encode_text(value: str, min_bytes: int | None = None) -> bytes:
+    data = value.encode("utf-8")
+    if min_bytes is None:
+        min_bytes = settings.CONTENT_COMPRESSION_MIN_BYTES
+    if len(data) >= min_bytes:
+        packed = zlib.compress(data, settings.CONTENT_COMPRESSION_LEVEL)
+        if len(packed) < len(data):
+            return ZLIB + packed
+    return RAW + data
+
+
+def decode_text(value: bytes | str) -> str:
+    if isinstance(value, str):  # not converted yet
+        return value
+    marker, data = value[:1], value[1:]
+    if marker == ZLIB:
+        data = zlib.decompress(data)
+    elif marker != RAW:
+        raise ValueError(f"unknown compressed text marker {marker!r}")
+    return data.decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name in COMPRESSED_DIALECTS:
+            return dialect.type_descriptor(LargeBinary())
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name not in COMPRESSED_DIALECTS:
+            return value
+        return encode_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name not in COMPRESSED_DIALECTS:
+            return value
+        return decode_text(value)
+
+
+def _convert(conn: Connection, table: str, column: str, stored_as: str, convert, batch_size: int, commit: bool) -> int:
+    if conn.dialect.name not in COMPRESSED_DIALECTS:
+        return 0
+    select_batch = text(f"SELECT id, {column} FROM {table} WHERE typeof({column}) = '{stored_as}' ORDER BY id LIMIT :n")
+    update_row = text(f"UPDATE {table} SET {column} = :value WHERE id = :id")
+    converted = 0
+    while True:
+        rows = conn.execute(select_batch, {"n": batch_size}).all()
+        if not rows:
+            return converted
+        conn.execute(update_row, [{"id": row_id, "value": convert(value)} for row_id, value in rows])
+        if commit:
+            conn.commit()
+        converted += len(rows)
+
+
+def compress_existing(conn: Connection, table: str, column: str, batch_size: int = 500, commit: bool = True) -> int:
+    """Compress the rows of ``table.column`` still stored as TEXT, ``batch_size`` at a
+    time, each batch committed on its own (pass ``commit=False`` on a connection
+    in autocommit mode). Returns the number of rows converted."""
+    return _convert(conn, table, column, "text", encode_text, batch_size, commit)
+
+
+def decompress_existing(conn: Connection, table: str, column: str, batch_size: int = 500, commit: bool = True) -> int:
+    """Undo ``compress_existing``: store ``table.column`` as TEXT again."""
+    return _convert(conn, table, column, "blob", decode_text, batch_size, commit)
+
+
+COMPRESSED_COLUMNS = (("notes", "content"), ("note_versions", "content_snapshot"))
+
+
+def main() -> None:
+    from app.db.session import engine
+    with engine.connect() as conn:
+        for table, column in COMPRESSED_COLUMNS:
+            print(f"{table}.{column}: compressed {compress_existing(conn, table, column)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Full-text search index for notes.
+
+SQLite keeps an FTS5 virtual table and PostgreSQL a tsvector table with a GIN
+index, both named ``notes_fts`` and keyed by note id. The index is maintained
+from the CRUD layer (``index_note`` / ``unindex_note``) so every write path keeps
+it in sync. Other dialects fall back to ILIKE scans.
+"""
+import re
+
+from sqlalchemy import text, func, literal_column, select, table, Float, Integer, String, or_
+from sqlalchemy.orm import Session
+
+FTS_TABLE = "notes_fts"
+PG_TS_CONFIG = "english"
+SNIPPET_TOKENS = 24
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, content, tokenize='unicode61 remove_diacritics 2')",
+]
+_POSTGRES_DDL = [
+    f"CREATE TABLE IF NOT EXISTS {FTS_TABLE} ("
+    "note_id INTEGER PRIMARY KEY REFERENCES notes(id) ON DELETE CASCADE, "
+    "document TSVECTOR NOT NULL)",
+    f"CREATE INDEX IF NOT EXISTS ix_{FTS_TABLE}_document ON {FTS_TABLE} USING GIN (document)",
+]
+
+
+def _dialect(bind) -> str:
+    return bind.dialect.name
+
+
+def create_search_index(target, connection, **kw) -> None:
+    """DDL listener: create the search index next to the notes table."""
+    name = _dialect(connection)
+    ddl = _SQLITE_DDL if name == "sqlite" else _POSTGRES_DDL if name == "postgresql" else []
+    for stmt in ddl:
+        connection.execute(text(stmt))
+
+
+def drop_search_index(target, connection, **kw) -> None:
+    """DDL listener: drop the search index before the notes table goes away."""
+    if _dialect(connection) in ("sqlite", "postgresql"):
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def index_note(db: Session, note_id: int, title: str, content: str) -> None:
+    """Insert or replace the index entry of a note. Runs in the caller's transaction."""
+    index_notes(db, [(note_id, title, content)])
+
+
+def index_notes(db: Session, notes: list[tuple[int, str, str]]) -> None:
+    """``index_note`` for many ``(note_id, title, content)`` rows, as executemany."""
+    if not notes:
+        return
+    name = _dialect(db.get_bind())
+    params = [{"id": note_id, "title": title, "content": content} for note_id, title, content in notes]
+    if name == "sqlite":
+        db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), [{"id": p["id"]} for p in params])
+        db.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, title, content) VALUES (:id, :title, :content)"),
+            params,
+        )
+    elif name == "postgresql":
+        db.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (note_id, document) VALUES (:id, "
+                f"setweight(to_tsvector('{PG_TS_CONFIG}', :title), 'A') || "
+                f"setweight(to_tsvector('{PG_TS_CONFIG}', :content), 'B')) "
+                "ON CONFLICT (note_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            params,
+        )
+
+
+def unindex_note(db: Session, note_id: int) -> None:
+    """Remove a note from the index. Runs in the caller's transaction."""
+    unindex_notes(db, [note_id])
+
+
+def unindex_notes(db: Session, note_ids: list[int]) -> None:
+    if not note_ids:
+        return
+    name = _dialect(db.get_bind())
+    params = [{"id": note_id} for note_id in note_ids]
+    if name == "sqlite":
+        db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), params)
+    elif name == "postgresql":
+        db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE note_id = :id"), params)
+
+
+def tokenize(q: str) -> list[str]:
+    return _TOKEN_RE.findall(q.lower())
+
+
+def _pg_query(tokens: list[str]) -> str:
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def match_subquery(db: Session, q: str, snippet: bool = False):
+    """Return a subquery of ``(note_id, score)`` rows matching ``q``, or None.
+
+    Every word of ``q`` must match (as a prefix). Higher scores rank better.
+    Returns None when the dialect has no full-text index, in which case the
+    caller should use ``ilike_clause``. With ``snippet=True`` SQLite also
+    returns the matching excerpt of the content (see ``snippet_column``).
+    """
+    tokens = tokenize(q)
+    name = _dialect(db.get_bind())
+    columns = {"note_id": Integer, "score": Float}
+    if name == "sqlite":
+        query = " ".join(f'"{t}"*' for t in tokens)
+        excerpt = ""
+        if snippet:
+            excerpt = f", snippet({FTS_TABLE}, 1, '', '', '…', {SNIPPET_TOKENS}) AS snippet"
+            columns["snippet"] = String
+        stmt = text(
+            f"SELECT rowid AS note_id, -bm25({FTS_TABLE}, 10.0, 1.0) AS score{excerpt} "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q"
+        )
+    elif name == "postgresql":
+        query = _pg_query(tokens)
+        stmt = text(
+            f"SELECT note_id, ts_rank(document, query) AS score "
+            f"FROM {FTS_TABLE}, to_tsquery('{PG_TS_CONFIG}', :q) AS query "
+            "WHERE document @@ query"
+        )
+    else:
+        return None
+    if not tokens:
+        # Nothing searchable in q: match no rows rather than everything.
+        nulls = {Integer: "INTEGER", Float: "FLOAT", String: "TEXT"}
+        empty = text("SELECT " + ", ".join(f"CAST(NULL AS {nulls[t]}) AS {c}" for c, t in columns.items()) + " WHERE 1 = 0")
+        return empty.columns(**columns).subquery("fts")
+    return stmt.bindparams(q=query).columns(**columns).subquery("fts")
+
+
+def snippet_column(db: Session, fts, q: str, content_col):
+    """Excerpt of the content around the matches of ``q``, computed in the database.
+
+    ``fts`` must come from ``match_subquery(..., snippet=True)``.
+    """
+    if _dialect(db.get_bind()) == "sqlite":
+        return fts.c.snippet
+    return func.ts_headline(
+        PG_TS_CONFIG,
+        content_col,
+        func.to_tsquery(PG_TS_CONFIG, _pg_query(tokenize(q)) or "''"),
+        f'MaxFragments=1, MaxWords={SNIPPET_TOKENS}, MinWords=5, StartSel="", StopSel=""',
+    )
+
+
+def preview_column(db: Session, id_col, content_col, length: int):
+    """The first ``length`` characters of the content, computed in the database.
+
+    On SQLite the content column may be compressed (app.db.compression), so the
+    text is taken from the full-text index, which keeps it uncompressed.
+    """
+    if _dialect(db.get_bind()) == "sqlite":
+        return (
+            select(func.substr(literal_column(f"{FTS_TABLE}.content"), 1, length))
+            .select_from(table(FTS_TABLE))
+            .where(literal_column(f"{FTS_TABLE}.rowid") == id_col)
+            .scalar_subquery()
+        )
+    return func.substr(content_col, 1, length)
+
+
+def ilike_clause(title_col, content_col, q: str):
+    like = f"%{q}%"
+    return or_(title_col.ilike(like), content_col.ilike(like))
@@ -1,10 +1,26 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import TimedQueuePool, instrument_engine
 
 connect_args = {}
+pool_options = {
+    "poolclass": TimedQueuePool,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+}
 if settings.DATABASE_URL.startswith("sqlite"):
     connect_args["check_same_thread"] = False
+    if make_url(settings.DATABASE_URL).database in (None, "", ":memory:"):
+        # in-memory SQLite keeps its default single-connection pool
+        pool_options = {}
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args, pool_pre_ping=True)
+engine = create_engine(
+    settings.DATABASE_URL,
+    connect_args=connect_args,
+    pool_pre_ping=True,
+    **pool_options,
+)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
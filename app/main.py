@@ -1,10 +1,18 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.api.router import api_router
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import engine, SessionLocal
+from app.core.activity_sink import activity_sink
+from app.core.activity_retention import RetentionJob
+from app.core.version_compaction import VersionCompactionJob
+from app.core.live import live_hub
+from app.core.security import password_hasher
+from app.core import metrics
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 # Import models to register them with Base
 from app.models import user, note, note_version, collaborator, activity_log
@@ -13,7 +21,34 @@ from app.models import user, note, note_version, collaborator, activity_log
 async def lifespan(app: FastAPI):
     # Create tables on startup
     Base.metadata.create_all(bind=engine)
+    jobs = []
+    if settings.ACTIVITY_RETENTION_DAYS > 0:
+        jobs.append(RetentionJob(
+            engine,
+            days=settings.ACTIVITY_RETENTION_DAYS,
+            batch_size=settings.ACTIVITY_RETENTION_BATCH_SIZE,
+            interval=settings.ACTIVITY_RETENTION_INTERVAL_SECONDS,
+            archive_path=settings.ACTIVITY_ARCHIVE_PATH,
+        ))
+    if settings.VERSION_RETENTION_TIERS and settings.VERSION_COMPACTION_INTERVAL_SECONDS > 0:
+        jobs.append(VersionCompactionJob(
+            SessionLocal,
+            batch_size=settings.VERSION_COMPACTION_BATCH_SIZE,
+            interval=settings.VERSION_COMPACTION_INTERVAL_SECONDS,
+        ))
+    for job in jobs:
+        job.start()
     yield
+    for job in jobs:
+        job.close()
+    # Write out pending live edits and disconnect their subscribers
+    await live_hub.close()
+    # Write out buffered activity rows before the process exits
+    activity_sink.close()
+    password_hasher.shutdown()
+    if settings.DB_ASYNC:
+        from app.db.async_session import dispose_async_engine
+        await dispose_async_engine()
 
 app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
@@ -39,9 +74,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 app.include_router(api_router)
 
+if settings.METRICS_ENABLED:
+    # added last so it wraps CORS too and times the whole request
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Text, DateTime, ForeignKey, func, Enum as SQLEnum
+from sqlalchemy import Integer, String, Text, Date, DateTime, ForeignKey, func, Index, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 import enum
@@ -14,6 +14,11 @@ class ActionType(str, enum.Enum):
 
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        # keyset pagination of note / user timelines by (timestamp, id)
+        Index("ix_activity_logs_note_id_timestamp", "note_id", "timestamp", "id"),
+        Index("ix_activity_logs_user_id_timestamp", "user_id", "timestamp", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
@@ -24,3 +29,23 @@ class ActivityLog(Base):
 
     user = relationship("User", back_populates="activity_logs")
     note = relationship("Note", back_populates="activity_logs")
+
+class ActivityRollup(Base):
+    """Per-note, per-user, per-day action counts.
+
+    Maintained incrementally by the activity sink in the same transaction as
+    the raw rows, so it keeps counting after old ActivityLog rows are purged.
+    """
+    __tablename__ = "activity_rollups"
+    __table_args__ = (
+        # upsert target; also serves per-note stats by day
+        UniqueConstraint("note_id", "day", "user_id", "action", name="uq_activity_rollups_key"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    note_id: Mapped[int] = mapped_column(ForeignKey("notes.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # UTC day of the activity
+    day: Mapped["Date"] = mapped_column(Date, nullable=False)
+    action: Mapped[str] = mapped_column(SQLEnum(ActionType), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
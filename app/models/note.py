@@ -1,23 +1,51 @@
-from sqlalchemy import String, Text, DateTime, ForeignKey, func, Index
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from datetime import datetime, timezone
+
+from sqlalchemy import Integer, String, DateTime, ForeignKey, func, event, Index
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship, validates
 from app.db.base import Base
+from app.db.compression import CompressedText
+from app.db.search import create_search_index, drop_search_index
 
 class Note(Base):
     __tablename__ = "notes"
     __table_args__ = (
-        Index("ix_notes_title_content", "title", "content"),
+        # keyset pagination of a user's notes by (updated_at, id)
+        Index("ix_notes_owner_id_updated_at", "owner_id", "updated_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    content: Mapped[str] = mapped_column(CompressedText, nullable=False)
+    # kept with the content (it may be compressed, so SQL can't measure it)
+    content_length: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0",
+        default=lambda ctx: len(ctx.get_current_parameters()["content"]),
+    )
 
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    # number of the newest NoteVersion; incremented in the UPDATE that applies each edit
+    current_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     created_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # set in Python on update: SQLite's CURRENT_TIMESTAMP only has second resolution,
+    # and ETags (app.utils.etag) must change on every write
+    updated_at: Mapped["DateTime"] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=lambda: datetime.now(timezone.utc)
+    )
+
+    # computed in SQL by summary listings (see app.crud.note), None otherwise
+    preview: Mapped[str | None] = query_expression()
 
     owner = relationship("User", back_populates="notes")
     versions = relationship("NoteVersion", back_populates="note", cascade="all, delete-orphan")
     collaborators = relationship("NoteCollaborator", back_populates="note", cascade="all, delete-orphan")
     activity_logs = relationship("ActivityLog", back_populates="note")
+
+    @validates("content")
+    def _track_length(self, key, value):
+        self.content_length = len(value)
+        return value
+
+# Full-text index (FTS5 / tsvector) lives outside the ORM metadata
+event.listen(Note.__table__, "after_create", create_search_index)
+event.listen(Note.__table__, "before_drop", drop_search_index)
@@ -1,6 +1,7 @@
 from sqlalchemy import Integer, Text, DateTime, ForeignKey, func, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
+from app.db.compression import CompressedText
 
 class NoteVersion(Base):
     __tablename__ = "note_versions"
@@ -15,7 +16,11 @@ class NoteVersion(Base):
 
     # snapshot (requirement says content snapshot; we store title+content snapshot for better restore)
     title_snapshot: Mapped[str] = mapped_column(String(200), nullable=False)
-    content_snapshot: Mapped[str] = mapped_column(Text, nullable=False)
+    # keyframes store the full content; other versions store a delta (see app.utils.delta)
+    # against the keyframe `base_version` and leave content_snapshot NULL until materialized
+    content_snapshot: Mapped[str | None] = mapped_column(CompressedText, nullable=True)
+    content_delta: Mapped[str | None] = mapped_column(Text, nullable=True)
+    base_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     editor_user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     created_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), server_default=func.now())
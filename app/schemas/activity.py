@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 class ActionType(str, Enum):
@@ -22,3 +22,14 @@ class ActivityLogOut(BaseModel):
     timestamp: datetime
 
     model_config = {"from_attributes": True}
+
+class NoteStatsDay(BaseModel):
+    day: date
+    counts: dict[ActionType, int]
+
+class NoteStatsOut(BaseModel):
+    note_id: int
+    since: date
+    unique_users: int
+    totals: dict[ActionType, int]
+    daily: list[NoteStatsDay]
@@ -1,6 +1,18 @@
-from pydantic import BaseModel, Field
+from enum import Enum
+from typing import Literal
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 
+from app.core.config import settings
+
+class NoteView(str, Enum):
+    full = "full"
+    summary = "summary"
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    zip = "zip"
+
 class NoteCreate(BaseModel):
     title: str = Field(min_length=1, max_length=200)
     content: str = Field(min_length=1)
@@ -9,6 +21,40 @@ class NoteUpdate(BaseModel):
     title: str | None = Field(default=None, min_length=1, max_length=200)
     content: str | None = Field(default=None, min_length=1)
 
+class TextOpKind(str, Enum):
+    insert = "insert"
+    delete = "delete"
+    replace = "replace"
+
+class TextOp(BaseModel):
+    op: TextOpKind
+    offset: int = Field(ge=0)  # in characters, into the text as left by the previous ops
+    length: int = Field(default=0, ge=0)  # characters removed by delete / replace
+    text: str = ""  # inserted by insert / replace
+
+class NotePatch(BaseModel):
+    """Incremental edit: ``ops`` are applied to the content the client last saw,
+    identified by ``base_version`` (the note's ``current_version``) or
+    ``base_hash`` (hex SHA-256 of the content)."""
+    base_version: int | None = None
+    base_hash: str | None = None
+    title: str | None = Field(default=None, min_length=1, max_length=200)
+    ops: list[TextOp] = Field(default=[], max_length=settings.NOTE_PATCH_MAX_OPS)
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.base_version is None and self.base_hash is None:
+            raise ValueError("base_version or base_hash is required")
+        if not self.ops and self.title is None:
+            raise ValueError("nothing to change")
+        return self
+
+class LiveEdit(BaseModel):
+    """Ops sent over /ws/notes/{id}, based on live revision ``rev``."""
+    type: Literal["ops"] = "ops"
+    rev: int
+    ops: list[TextOp] = Field(min_length=1, max_length=settings.NOTE_PATCH_MAX_OPS)
+
 class NoteOut(BaseModel):
     id: int
     title: str
@@ -16,8 +62,65 @@ class NoteOut(BaseModel):
     owner_id: int
     created_at: datetime
     updated_at: datetime
+    current_version: int  # base_version for PATCH
 
     model_config = {"from_attributes": True}
 
 class NoteWithRoleOut(NoteOut):
     role: str  # 'owner', 'editor', 'viewer'
+
+class NoteSummaryOut(BaseModel):
+    """List item for ?view=summary: a preview (or search snippet) instead of the content."""
+    id: int
+    title: str
+    preview: str
+    content_length: int
+    owner_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+class NoteSummaryWithRoleOut(NoteSummaryOut):
+    role: str
+
+class BatchOp(str, Enum):
+    create = "create"
+    update = "update"
+    delete = "delete"
+
+class NoteBatchOperation(BaseModel):
+    op: BatchOp
+    id: int | None = None  # required for update / delete
+    title: str | None = Field(default=None, min_length=1, max_length=200)
+    content: str | None = Field(default=None, min_length=1)
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.op == BatchOp.create and (self.title is None or self.content is None):
+            raise ValueError("create needs a title and content")
+        if self.op != BatchOp.create and self.id is None:
+            raise ValueError(f"{self.op.value} needs an id")
+        return self
+
+class NoteBatchIn(BaseModel):
+    operations: list[NoteBatchOperation] = Field(min_length=1, max_length=settings.NOTE_BATCH_MAX_OPERATIONS)
+
+class NoteBatchResult(BaseModel):
+    index: int
+    op: BatchOp
+    status: int  # HTTP status the single-note endpoint would have returned
+    id: int | None = None
+    detail: str | None = None
+
+class NoteImportError(BaseModel):
+    line: int
+    file: str | None = None
+    detail: str
+
+class NoteImportResult(BaseModel):
+    lines: int
+    imported: int
+    skipped: int
+    failed: int
+    errors: list[NoteImportError]
@@ -1,3 +1,4 @@
+from enum import Enum
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -11,3 +12,27 @@ class VersionOut(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+class VersionCompactionOut(BaseModel):
+    note_id: int
+    dry_run: bool
+    kept: list[int]
+    removed: list[int]
+
+class DiffFormat(str, Enum):
+    ops = "ops"
+    unified = "unified"
+
+class VersionDiffOut(BaseModel):
+    note_id: int
+    from_version: int
+    to_version: int | None  # None: the current note
+    format: DiffFormat
+    # False when the inputs differed too much for a minimal diff and the changed
+    # region is reported as one replace
+    exact: bool
+    added: int
+    removed: int
+    # ["=", n] keep n lines, ["-", n] drop n lines, ["+", [lines]] insert
+    ops: list[list] | None = None
+    unified: str | None = None
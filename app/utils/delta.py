@@ -0,0 +1,31 @@
+"""Compact line-based deltas between two texts.
+
+A delta is a JSON list of operations applied in order to rebuild the target:
+``[start, end]`` copies ``base_lines[start:end]``, a string is inserted as is.
+"""
+import json
+from difflib import SequenceMatcher
+
+
+def make_delta(base: str, target: str) -> str:
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops: list = []
+    matcher = SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:  # replace / insert
+            ops.append("".join(target_lines[j1:j2]))
+    return json.dumps(ops, separators=(",", ":"), ensure_ascii=False)
+
+
+def apply_delta(base: str, delta: str) -> str:
+    base_lines = base.splitlines(keepends=True)
+    out = []
+    for op in json.loads(delta):
+        if isinstance(op, str):
+            out.append(op)
+        else:
+            out.extend(base_lines[op[0]:op[1]])
+    return "".join(out)
@@ -0,0 +1,160 @@
+"""Line diffs with a bounded cost.
+
+``diff_lines`` strips the common prefix and suffix, then runs Myers' O((N+M)·D)
+algorithm on the rest with lines interned to ints. D is capped at ``max_edits``.
+Past the cap, the changed middle is reported as a single replace, so the cost
+stays linear in the input size whatever the input looks like. The result is a
+list of difflib-style opcodes ``(tag, i1, i2, j1, j2)``.
+"""
+from typing import Iterator
+
+Opcode = tuple[str, int, int, int, int]
+
+
+def _myers(a: list[int], b: list[int], max_edits: int) -> list[tuple[str, int, int]] | None:
+    """Shortest edit script as ("=" | "-" | "+", x, y) steps, or None past ``max_edits``."""
+    n, m = len(a), len(b)
+    v = {1: 0}
+    trace = []
+    for d in range(max_edits + 1):
+        trace.append(v.copy())
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return None
+
+
+def _backtrack(trace: list[dict], x: int, y: int) -> list[tuple[str, int, int]]:
+    steps = []
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            steps.append(("=", x, y))
+        if d > 0:
+            steps.append(("+", prev_x, prev_y) if x == prev_x else ("-", prev_x, prev_y))
+        x, y = prev_x, prev_y
+    steps.reverse()
+    return steps
+
+
+def _opcodes(steps: list[tuple[str, int, int]], i0: int, j0: int) -> Iterator[Opcode]:
+    names = {"=": "equal", "-": "delete", "+": "insert"}
+    run = None
+    for kind, x, y in steps:
+        di, dj = (1, 1) if kind == "=" else (1, 0) if kind == "-" else (0, 1)
+        if run and run[0] == kind:
+            run[2] += di
+            run[4] += dj
+        else:
+            if run:
+                yield (names[run[0]], run[1] + i0, run[2] + i0, run[3] + j0, run[4] + j0)
+            run = [kind, x, x + di, y, y + dj]
+    if run:
+        yield (names[run[0]], run[1] + i0, run[2] + i0, run[3] + j0, run[4] + j0)
+
+
+def diff_lines(a: list[str], b: list[str], max_edits: int) -> tuple[list[Opcode], bool]:
+    """Opcodes turning ``a`` into ``b``, and whether the diff is minimal."""
+    prefix = 0
+    while prefix < len(a) and prefix < len(b) and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < len(a) - prefix and suffix < len(b) - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    a_mid, b_mid = a[prefix:len(a) - suffix], b[prefix:len(b) - suffix]
+
+    ops: list[Opcode] = []
+    if prefix:
+        ops.append(("equal", 0, prefix, 0, prefix))
+    exact = True
+    if a_mid or b_mid:
+        ids: dict[str, int] = {}
+        a_ids = [ids.setdefault(line, len(ids)) for line in a_mid]
+        b_ids = [ids.setdefault(line, len(ids)) for line in b_mid]
+        steps = _myers(a_ids, b_ids, max_edits)
+        if steps is not None:
+            ops.extend(_opcodes(steps, prefix, prefix))
+        else:
+            exact = False
+            if a_mid:
+                ops.append(("delete", prefix, prefix + len(a_mid), prefix, prefix))
+            if b_mid:
+                ops.append(("insert", prefix + len(a_mid), prefix + len(a_mid), prefix, prefix + len(b_mid)))
+    if suffix:
+        ops.append(("equal", len(a) - suffix, len(a), len(b) - suffix, len(b)))
+    return ops, exact
+
+
+def line_ops(b: list[str], opcodes: list[Opcode]) -> list[list]:
+    """Compact ops that rebuild ``b`` from ``a``: ["=", n] keeps, ["-", n] skips
+    the next n lines of ``a``, ["+", [lines]] inserts."""
+    out: list[list] = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        step = ["=", i2 - i1] if tag == "equal" else ["-", i2 - i1] if tag == "delete" else ["+", b[j1:j2]]
+        if out and out[-1][0] == step[0]:
+            out[-1][1] += step[1]
+        else:
+            out.append(step)
+    return out
+
+
+def unified(a: list[str], b: list[str], opcodes: list[Opcode], from_name: str, to_name: str, context: int = 3) -> str:
+    """Render opcodes as a unified diff (the hunk grouping follows difflib)."""
+    if all(tag == "equal" for tag, *_ in opcodes):
+        return ""
+    lines = [f"--- {from_name}\n", f"+++ {to_name}\n"]
+    for group in _grouped(opcodes, context):
+        i1, i2, j1, j2 = group[0][1], group[-1][2], group[0][3], group[-1][4]
+        lines.append(f"@@ -{_range(i1, i2)} +{_range(j1, j2)} @@\n")
+        for tag, a1, a2, b1, b2 in group:
+            if tag == "equal":
+                lines.extend(" " + line for line in a[a1:a2])
+            elif tag == "delete":
+                lines.extend("-" + line for line in a[a1:a2])
+            else:
+                lines.extend("+" + line for line in b[b1:b2])
+    return "".join(line if line.endswith("\n") else line + "\n\\ No newline at end of file\n" for line in lines)
+
+
+def _range(start: int, stop: int) -> str:
+    length = stop - start
+    first = start + 1 if length else start
+    return str(first) if length == 1 else f"{first},{length}"
+
+
+def _grouped(opcodes: list[Opcode], n: int) -> Iterator[list[Opcode]]:
+    codes = list(opcodes)
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+    group: list[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > n * 2:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
@@ -0,0 +1,33 @@
+"""Entity tags for conditional GETs.
+
+Tags are built from cheap columns (ids, ``updated_at``, version numbers), so a
+poll whose tag still matches is answered with 304 before any note content is
+loaded or serialized.
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+IF_NONE_MATCH = "if-none-match"
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def is_conditional(request: Request) -> bool:
+    return IF_NONE_MATCH in request.headers
+
+
+def check_etag(request: Request, response: Response, etag: str) -> Response | None:
+    """Set the ETag header; return a 304 response if the client's copy is current."""
+    response.headers["ETag"] = etag
+    header = request.headers.get(IF_NONE_MATCH)
+    if not header:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
@@ -0,0 +1,33 @@
+"""Incremental NDJSON line splitting for uploads.
+
+Both readers hold at most one line in memory. A line longer than ``limit``
+bytes is skipped up to its newline and yielded as None, so the caller can
+report it without buffering it.
+"""
+from typing import AsyncIterator, BinaryIO, Iterator
+
+
+async def stream_lines(chunks: AsyncIterator[bytes], limit: int) -> AsyncIterator[bytes | None]:
+    buf = bytearray()
+    overlong = False
+    async for chunk in chunks:
+        buf += chunk
+        while (end := buf.find(b"\n")) >= 0:
+            yield None if overlong else bytes(buf[:end])
+            del buf[:end + 1]
+            overlong = False
+        if len(buf) > limit:
+            overlong = True
+            buf.clear()
+    if buf or overlong:
+        yield None if overlong else bytes(buf)
+
+
+def file_lines(f: BinaryIO, limit: int) -> Iterator[bytes | None]:
+    while line := f.readline(limit + 1):
+        if len(line) > limit and not line.endswith(b"\n"):
+            while line and not line.endswith(b"\n"):
+                line = f.readline(limit + 1)
+            yield None
+            continue
+        yield line.rstrip(b"\n")
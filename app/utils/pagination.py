@@ -0,0 +1,86 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, url-safe encoding of the sort key of the last row on a
+page. The next page is selected with a seek predicate on that key, so every
+page costs the same as the first one (no OFFSET).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, NamedTuple, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import String, and_, literal, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: str | None
+
+
+class PageParams:
+    """Query parameters shared by every paginated endpoint."""
+
+    def __init__(
+        self,
+        limit: int = Query(default=settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+        cursor: str | None = Query(default=None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(*values: Any) -> str:
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("Bad cursor size")
+        return [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in payload]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _bind(db: Session, value: Any):
+    # SQLite keeps timestamps as text ("YYYY-MM-DD HH:MM:SS[.ffffff]"); compare
+    # against the same text form so rows equal to the cursor are recognized.
+    if isinstance(value, datetime) and db.get_bind().dialect.name == "sqlite":
+        return literal(value.replace(tzinfo=None).isoformat(sep=" "), String)
+    return value
+
+
+def seek(db: Session, columns: Sequence, cursor: str, descending: bool = True):
+    """Predicate selecting the rows that come after ``cursor`` in ``columns`` order."""
+    values = decode_cursor(cursor, len(columns))
+    clause = None
+    for col, value in reversed(list(zip(columns, values))):
+        value = _bind(db, value)
+        after = col < value if descending else col > value
+        clause = after if clause is None else or_(after, and_(col == value, clause))
+    return clause
+
+
+def paginate(rows: list, limit: int, key: Callable[[Any], tuple]) -> Page:
+    """Build a page from ``limit + 1`` fetched rows."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return Page(rows, encode_cursor(*key(rows[-1])))
+    return Page(rows, None)
+
+
+def set_next_cursor(response: Response, page: Page) -> list:
+    """Expose the next cursor as a response header and return the page items."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
@@ -0,0 +1,43 @@
+"""Character-offset text operations for incremental note edits.
+
+Operations are applied in order, and each offset refers to the text as left by
+the operations before it. Ops given front to back (the usual case for an
+editor's change set) are applied in a single pass over the text. An op that
+goes back to an earlier offset flattens what has been built so far first.
+"""
+import hashlib
+from typing import Iterable
+
+
+def content_hash(text: str) -> str:
+    """Hex SHA-256 of the UTF-8 text, the ``base_hash`` a client sends with its ops."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def apply_text_ops(text: str, ops: Iterable) -> str:
+    """Apply ops with ``op`` ("insert" | "delete" | "replace"), ``offset``,
+    ``length`` and ``text`` attributes. Raises ValueError on an out-of-range op."""
+    out: list[str] = []
+    out_len = 0  # length of out
+    src = text
+    pos = 0  # next unconsumed character of src
+    for i, op in enumerate(ops):
+        kind = getattr(op.op, "value", op.op)
+        if op.offset < out_len:
+            src = "".join(out) + src[pos:]
+            out, out_len, pos = [], 0, 0
+        gap = op.offset - out_len
+        if pos + gap > len(src):
+            raise ValueError(f"op {i}: offset {op.offset} is past the end of the text")
+        out.append(src[pos:pos + gap])
+        out_len += gap
+        pos += gap
+        if kind != "insert":
+            if pos + op.length > len(src):
+                raise ValueError(f"op {i}: {kind} of {op.length} at {op.offset} runs past the end of the text")
+            pos += op.length
+        if kind != "delete":
+            out.append(op.text)
+            out_len += len(op.text)
+    out.append(src[pos:])
+    return "".join(out)
@@ -0,0 +1,144 @@
+"""Side-by-side load test of the sync and async (DB_ASYNC) database paths.
+
+Drives GET /notes/{id} and GET /notes with many concurrent in-process
+clients against each app variant:
+
+    python -m benchmarks.bench_async --concurrency 200 --requests 4000
+    python -m benchmarks.bench_async --database-url postgresql://user:pw@localhost/bench
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.router import build_api_router
+from app.core.activity_sink import activity_sink
+from app.core.config import settings
+from app.core.deps import get_async_db, get_db
+from app.db.async_session import async_pool_options, to_async_url
+from app.db.base import Base
+
+
+def _build_app(url: str, async_db: bool):
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(
+        url, connect_args=connect_args, pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW
+    )
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_engine = create_async_engine(to_async_url(url), **async_pool_options(url))
+    async_factory = async_sessionmaker(bind=async_engine, autoflush=False)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with async_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(build_api_router(async_db=async_db))
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app, engine, async_engine
+
+
+async def _seed(client: httpx.AsyncClient, notes: int) -> tuple[dict, list[int]]:
+    creds = {"username": "load@bench.com", "password": "pass1234"}
+    await client.post("/auth/register", json={"email": creds["username"], "password": creds["password"]})
+    token = (await client.post("/auth/login", data=creds)).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    ids = []
+    for i in range(notes):
+        r = await client.post("/notes", json={"title": f"note {i}", "content": "lorem ipsum " * 50}, headers=headers)
+        ids.append(r.json()["id"])
+    return headers, ids
+
+
+async def _load(app: FastAPI, headers: dict, ids: list[int], concurrency: int, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    errors = 0
+    rng = random.Random(7)
+    plan = [f"/notes/{rng.choice(ids)}" if rng.random() < 0.8 else "/notes?limit=20" for _ in range(requests)]
+    queue: asyncio.Queue = asyncio.Queue()
+    for url in plan:
+        queue.put_nowait(url)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                url = queue.get_nowait()
+                start = time.perf_counter()
+                r = await client.get(url, headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += r.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    q = statistics.quantiles(latencies, n=100)
+    return {
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(q[49], 2),
+        "p95_ms": round(q[94], 2),
+        "p99_ms": round(q[98], 2),
+        "errors": errors,
+    }
+
+
+async def _run(url: str, notes: int, concurrency: int, requests: int) -> list[dict]:
+    results = []
+    headers = ids = None
+    for mode in ("sync", "async"):
+        app, engine, async_engine = _build_app(url, async_db=mode == "async")
+        if headers is None:
+            Base.metadata.drop_all(bind=engine)
+            Base.metadata.create_all(bind=engine)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                headers, ids = await _seed(client, notes)
+        results.append({"mode": mode, **await _load(app, headers, ids, concurrency, requests)})
+        activity_sink.flush()
+        await async_engine.dispose()
+        engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="defaults to a throwaway SQLite file")
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    path = None
+    url = args.database_url
+    if url is None:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{path}"
+    try:
+        print(json.dumps(asyncio.run(_run(url, args.notes, args.concurrency, args.requests)), indent=2))
+    finally:
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
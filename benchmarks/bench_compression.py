@@ -0,0 +1,94 @@
+"""Database size, insert cost and read latency with and without content compression.
+
+Each run writes the same notes (plus full-copy versions) to a throwaway SQLite
+file, once with CONTENT_COMPRESSION_MIN_BYTES at its configured value and once
+with compression effectively off. Run from the repo root:
+
+    python -m benchmarks.bench_compression --sizes 2000,20000,200000 --notes 50
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.crud import note as note_crud
+from app.db.base import Base
+from app.models import user, note, note_version, collaborator, activity_log  # noqa: F401
+from app.models.note import Note
+from app.models.user import User
+from benchmarks.bench_versions import _content
+
+OFF = 2**62
+
+
+def run(min_bytes: int, size: int, notes: int, versions: int, seed: int) -> dict:
+    settings.CONTENT_COMPRESSION_MIN_BYTES = min_bytes
+    settings.VERSION_KEYFRAME_INTERVAL = 1  # every version a full copy: the worst case
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine, autoflush=False)()
+        owner = User(email="bench@example.com", hashed_password="x")
+        db.add(owner)
+        db.commit()
+
+        rng = random.Random(seed)
+        insert_ms, ids = [], []
+        for i in range(notes):
+            lines = _content(rng, size)
+            start = time.perf_counter()
+            n = note_crud.create_note(db, owner.id, f"note {i}", "".join(lines))
+            insert_ms.append((time.perf_counter() - start) * 1000)
+            ids.append(n.id)
+            for _ in range(versions):
+                lines[rng.randrange(len(lines))] = f"edited {rng.random()}\n"
+                note_crud.update_note(db, n, owner.id, None, "".join(lines))
+
+        read_ms = []
+        for note_id in ids * 3:
+            db.expunge_all()
+            start = time.perf_counter()
+            len(db.get(Note, note_id).content)
+            read_ms.append((time.perf_counter() - start) * 1000)
+        db.close()
+    finally:
+        engine.dispose()
+        db_bytes = os.path.getsize(path)
+        os.remove(path)
+    return {
+        "compression": min_bytes != OFF,
+        "note_chars": size,
+        "db_bytes": db_bytes,
+        "insert_ms_p50": round(statistics.median(insert_ms), 3),
+        "read_ms_p50": round(statistics.median(read_ms), 3),
+        "read_ms_p95": round(statistics.quantiles(read_ms, n=20)[-1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="2000,20000,200000", help="comma-separated note sizes in characters")
+    parser.add_argument("--notes", type=int, default=50)
+    parser.add_argument("--versions", type=int, default=5, help="edits (full-copy versions) per note")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    configured = settings.CONTENT_COMPRESSION_MIN_BYTES
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        for min_bytes in (OFF, configured):
+            results.append(run(min_bytes, size, args.notes, args.versions, args.seed))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
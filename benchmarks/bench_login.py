@@ -0,0 +1,126 @@
+"""Login throughput and note-read latency during a login storm.
+
+Compares the dedicated password-hashing pool against hashing inline on the
+shared AnyIO thread pool. Runs in-process against a throwaway SQLite file:
+
+    python -m benchmarks.bench_login --logins 200 --readers 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.deps import get_db
+from app.core.security import password_hasher
+from app.db.base import Base
+from app.main import app
+
+
+def _use_database(url: str):
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return engine
+
+
+def _pct(values: list[float], q: int) -> float:
+    return round(statistics.quantiles(values, n=100)[q - 1], 2) if len(values) > 1 else round(values[0], 2)
+
+
+async def _scenario(logins: int, readers: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        creds = {"username": "storm@bench.com", "password": "pass1234"}
+        await client.post("/auth/register", json={"email": creds["username"], "password": creds["password"]})
+        token = (await client.post("/auth/login", data=creds)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        note_id = (await client.post("/notes", json={"title": "t", "content": "c"}, headers=headers)).json()["id"]
+
+        done = asyncio.Event()
+        read_ms: list[float] = []
+        read_errors = 0
+        statuses: dict[str, int] = {}
+
+        async def login():
+            try:
+                key = str((await client.post("/auth/login", data=creds)).status_code)
+            except Exception:  # e.g. connection pool timeouts once the thread pool starves
+                key = "error"
+            statuses[key] = statuses.get(key, 0) + 1
+
+        async def reader():
+            nonlocal read_errors
+            while not done.is_set():
+                start = time.perf_counter()
+                try:
+                    await client.get(f"/notes/{note_id}", headers=headers)
+                except Exception:
+                    read_errors += 1
+                read_ms.append((time.perf_counter() - start) * 1000)
+
+        reader_tasks = [asyncio.create_task(reader()) for _ in range(readers)]
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await asyncio.gather(*reader_tasks)
+
+    return {
+        "logins_per_s": round(statuses.get("200", 0) / elapsed, 1),
+        "login_statuses": statuses,
+        "read_ms_p50": _pct(read_ms, 50),
+        "read_ms_p95": _pct(read_ms, 95),
+        "reads": len(read_ms),
+        "read_errors": read_errors,
+    }
+
+
+def run(mode: str, logins: int, readers: int) -> dict:
+    original = password_hasher.run
+    if mode == "inline":
+        # previous behaviour: bcrypt on the AnyIO pool shared with every sync route
+        async def inline(fn, *args):
+            return await run_in_threadpool(fn, *args)
+        password_hasher.run = inline
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = _use_database(f"sqlite:///{path}")
+    try:
+        return {"mode": mode, **asyncio.run(_scenario(logins, readers))}
+    finally:
+        password_hasher.run = original
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+        os.remove(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--readers", type=int, default=10, help="concurrent note readers")
+    args = parser.parse_args()
+
+    results = [run(mode, args.logins, args.readers) for mode in ("inline", "pool")]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Storage size and reconstruction latency of full vs delta-encoded versions.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_versions --size 50000 --edits 200
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.crud import note as note_crud
+from app.db.base import Base
+from app.models import user, note, note_version, collaborator, activity_log  # noqa: F401
+from app.models.note_version import NoteVersion
+from app.models.user import User
+
+
+def _content(rng: random.Random, size: int) -> list[str]:
+    lines, total = [], 0
+    while total < size:
+        line = " ".join(f"word{rng.randrange(5000)}" for _ in range(rng.randint(4, 14))) + "\n"
+        lines.append(line)
+        total += len(line)
+    return lines
+
+
+def run(interval: int, size: int, edits: int, seed: int) -> dict:
+    settings.VERSION_KEYFRAME_INTERVAL = interval
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    rng = random.Random(seed)
+    owner = User(email="bench@example.com", hashed_password="x")
+    db.add(owner)
+    db.commit()
+    owner_id = owner.id
+
+    lines = _content(rng, size)
+    n = note_crud.create_note(db, owner_id, "bench", "".join(lines))
+    note_id = n.id
+
+    write_ms = []
+    for _ in range(edits):
+        # autosave-style edit: touch a few lines
+        for _ in range(rng.randint(1, 3)):
+            lines[rng.randrange(len(lines))] = f"edited {rng.random()}\n"
+        start = time.perf_counter()
+        note_crud.update_note(db, n, owner_id, None, "".join(lines))
+        write_ms.append((time.perf_counter() - start) * 1000)
+
+    stored = db.scalar(
+        select(func.sum(func.coalesce(func.length(NoteVersion.content_snapshot), 0)
+                        + func.coalesce(func.length(NoteVersion.content_delta), 0)))
+    )
+
+    read_ms = []
+    for number in range(1, edits + 1):
+        db.expunge_all()
+        start = time.perf_counter()
+        note_crud.get_version(db, note_id, number, owner_id)
+        read_ms.append((time.perf_counter() - start) * 1000)
+
+    db.close()
+    engine.dispose()
+    return {
+        "keyframe_interval": interval,
+        "stored_bytes": stored,
+        "write_ms_p50": round(statistics.median(write_ms), 3),
+        "read_ms_p50": round(statistics.median(read_ms), 3),
+        "read_ms_p95": round(statistics.quantiles(read_ms, n=20)[-1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000, help="note size in characters")
+    parser.add_argument("--edits", type=int, default=100)
+    parser.add_argument("--interval", type=int, default=20, help="keyframe interval for the delta run")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    results = [run(1, args.size, args.edits, args.seed), run(args.interval, args.size, args.edits, args.seed)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Compare two ``benchmarks.run`` reports, scenario by scenario.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "sql_per_request")
+
+
+def _change(before, after) -> str:
+    if before in (None, 0) or after is None:
+        return f"{before} -> {after}"
+    return f"{before} -> {after} ({(after - before) / before:+.0%})"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = {r["database"]: r["scenarios"] for r in json.load(f)["runs"]}
+    with open(args.after) as f:
+        after = {r["database"]: r["scenarios"] for r in json.load(f)["runs"]}
+
+    for database in [d for d in before if d in after]:
+        print(f"== {database}")
+        for name in [n for n in before[database] if n in after[database]]:
+            old, new = before[database][name], after[database][name]
+            print(f"  {old['endpoint']}")
+            for metric in METRICS:
+                print(f"    {metric:16} {_change(old.get(metric), new.get(metric))}")
+
+
+if __name__ == "__main__":
+    main()
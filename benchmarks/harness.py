@@ -0,0 +1,127 @@
+"""In-process load harness: app wiring, per-request SQL counting and latency stats."""
+import asyncio
+import statistics
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.router import build_api_router
+from app.core.config import settings
+from app.core.deps import get_db
+
+SQL_COUNT_HEADER = "x-bench-sql-count"
+
+_statements: ContextVar[list | None] = ContextVar("bench_statements", default=None)
+
+
+def make_engine(url: str) -> Engine:
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(
+        url, connect_args=connect_args, pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW
+    )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter = _statements.get()
+        if counter is not None:
+            counter[0] += 1
+
+    return engine
+
+
+def _count_sql(app):
+    """ASGI middleware reporting the statements each request ran in a response header.
+
+    The counter lives in a context variable, which run_in_threadpool copies into
+    the worker thread, so concurrent requests never mix their counts.
+    """
+    async def middleware(scope, receive, send):
+        if scope["type"] != "http":
+            return await app(scope, receive, send)
+        counter = [0]
+        _statements.set(counter)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((SQL_COUNT_HEADER.encode(), str(counter[0]).encode()))
+            await send(message)
+
+        await app(scope, receive, send_with_count)
+    return middleware
+
+
+def build_app(engine: Engine):
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(build_api_router(async_db=False))
+    app.dependency_overrides[get_db] = override_get_db
+    return _count_sql(app)
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    headers: dict
+    json: dict | None = None
+    data: dict | None = None
+
+
+def _pct(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return round(values[0], 2) if values else 0.0
+    return round(statistics.quantiles(values, n=100)[q - 1], 2)
+
+
+async def run_load(app, make_request: Callable[[int], Request], requests: int, concurrency: int) -> dict:
+    """Send ``requests`` requests from ``concurrency`` concurrent clients and summarize them."""
+    latencies: list[float] = []
+    sql_counts: list[int] = []
+    statuses: dict[str, int] = {}
+    pending = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300) as client:
+        async def worker():
+            for i in pending:
+                req = make_request(i)
+                start = time.perf_counter()
+                try:
+                    r = await client.request(req.method, req.url, headers=req.headers, json=req.json, data=req.data)
+                    key = str(r.status_code)
+                    sql_counts.append(int(r.headers.get(SQL_COUNT_HEADER, 0)))
+                except Exception:  # e.g. pool timeouts under overload
+                    key = "error"
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[key] = statuses.get(key, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    errors = sum(n for key, n in statuses.items() if key == "error" or int(key) >= 400)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "statuses": statuses,
+        "throughput_rps": round(requests / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p50_ms": _pct(latencies, 50),
+        "p95_ms": _pct(latencies, 95),
+        "p99_ms": _pct(latencies, 99),
+        "sql_per_request": round(statistics.fmean(sql_counts), 2) if sql_counts else None,
+        "sql_max": max(sql_counts, default=None),
+    }
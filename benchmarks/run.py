@@ -0,0 +1,117 @@
+"""Seed a database and run the endpoint scenarios against it, printing JSON.
+
+Runs in-process against a throwaway SQLite file, and also against PostgreSQL
+when --postgres-url (or BENCH_POSTGRES_URL) points at a reachable server:
+
+    python -m benchmarks.run --out before.json
+    python -m benchmarks.run --scenarios list,search --users 50 --notes-per-user 200
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import tempfile
+from dataclasses import asdict
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.activity_sink import activity_sink
+from app.core.principal import principal_cache
+from app.crud.collaborator import access_cache
+from benchmarks.harness import build_app, make_engine, run_load
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.seed import SeedConfig, seed
+
+
+def run_database(url: str, config: SeedConfig, scenarios: list[str], requests: int, concurrency: int) -> dict:
+    engine = make_engine(url)
+    try:
+        data = seed(engine, config)
+        app = build_app(engine)
+        # ids repeat between databases; don't let one run's caches serve the next
+        principal_cache.clear()
+        access_cache.clear()
+        results = {}
+        for i, name in enumerate(scenarios):
+            endpoint, scenario = SCENARIOS[name]
+            make_request = scenario(data, random.Random(config.seed + i))
+            results[name] = {"endpoint": endpoint, **asyncio.run(run_load(app, make_request, requests, concurrency))}
+            activity_sink.flush()
+        return {"database": engine.dialect.name, "scenarios": results}
+    finally:
+        activity_sink.flush()
+        engine.dispose()
+
+
+def _reachable(url: str) -> bool:
+    engine = make_engine(url)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except OperationalError:
+        return False
+    finally:
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=SeedConfig.users)
+    parser.add_argument("--notes-per-user", type=int, default=SeedConfig.notes_per_user)
+    parser.add_argument("--content-median", type=int, default=SeedConfig.content_median, help="median note size in characters")
+    parser.add_argument("--content-sigma", type=float, default=SeedConfig.content_sigma, help="log-normal spread of note sizes")
+    parser.add_argument("--version-depth", type=int, default=SeedConfig.version_depth)
+    parser.add_argument("--share-fanout", type=int, default=SeedConfig.share_fanout)
+    parser.add_argument("--seed", type=int, default=SeedConfig.seed)
+    parser.add_argument("--postgres-url", default=os.environ.get("BENCH_POSTGRES_URL"), help="also run against this database (it is wiped)")
+    parser.add_argument("--out", default=None, help="write the JSON report here as well")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - SCENARIOS.keys()
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    config = SeedConfig(
+        users=args.users,
+        notes_per_user=args.notes_per_user,
+        content_median=args.content_median,
+        content_sigma=args.content_sigma,
+        version_depth=args.version_depth,
+        share_fanout=args.share_fanout,
+        seed=args.seed,
+    )
+
+    report = {
+        "config": {**asdict(config), "requests": args.requests, "concurrency": args.concurrency},
+        "python": platform.python_version(),
+        "runs": [],
+    }
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        report["runs"].append(run_database(f"sqlite:///{path}", config, scenarios, args.requests, args.concurrency))
+    finally:
+        os.remove(path)
+    if args.postgres_url:
+        if _reachable(args.postgres_url):
+            report["runs"].append(run_database(args.postgres_url, config, scenarios, args.requests, args.concurrency))
+        else:
+            report["skipped"] = {"postgresql": "server not reachable"}
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
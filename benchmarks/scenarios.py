@@ -0,0 +1,94 @@
+"""Load scenarios, one per endpoint.
+
+Each scenario turns a request index into a request against the seeded
+dataset. Requests are derived from a per-scenario RNG, so every run sends the
+same sequence.
+"""
+import random
+from typing import Callable
+
+from app.core.security import create_access_token
+from benchmarks.harness import Request
+from benchmarks.seed import PASSWORD, Dataset, edited_line, search_term
+
+Scenario = Callable[[Dataset, random.Random], Callable[[int], Request]]
+
+
+def _tokens(data: Dataset) -> dict[int, dict]:
+    return {u: {"Authorization": f"Bearer {create_access_token(str(u))}"} for u in data.user_ids}
+
+
+def auth(data: Dataset, rng: random.Random):
+    def make(i: int) -> Request:
+        email = data.emails[rng.choice(data.user_ids)]
+        return Request("POST", "/auth/login", {}, data={"username": email, "password": PASSWORD})
+    return make
+
+
+def list_notes(data: Dataset, rng: random.Random):
+    headers = _tokens(data)
+
+    def make(i: int) -> Request:
+        return Request("GET", "/notes?limit=20", headers[rng.choice(data.user_ids)])
+    return make
+
+
+def search(data: Dataset, rng: random.Random):
+    headers = _tokens(data)
+
+    def make(i: int) -> Request:
+        return Request("GET", f"/notes/search?q={search_term(rng)}&limit=20", headers[rng.choice(data.user_ids)])
+    return make
+
+
+def get(data: Dataset, rng: random.Random):
+    headers = _tokens(data)
+
+    def make(i: int) -> Request:
+        owner = rng.choice(data.user_ids)
+        return Request("GET", f"/notes/{rng.choice(data.notes_by_owner[owner])}", headers[owner])
+    return make
+
+
+def update(data: Dataset, rng: random.Random):
+    headers = _tokens(data)
+
+    def make(i: int) -> Request:
+        owner = rng.choice(data.user_ids)
+        note_id = rng.choice(data.notes_by_owner[owner])
+        return Request("PUT", f"/notes/{note_id}", headers[owner], json={"content": edited_line(rng) * 20})
+    return make
+
+
+def share(data: Dataset, rng: random.Random):
+    headers = _tokens(data)
+
+    def make(i: int) -> Request:
+        owner, other = rng.sample(data.user_ids, 2)
+        note_id = rng.choice(data.notes_by_owner[owner])
+        role = rng.choice(("viewer", "editor"))
+        return Request("POST", f"/notes/{note_id}/share", headers[owner], json={"email": data.emails[other], "role": role})
+    return make
+
+
+def restore(data: Dataset, rng: random.Random):
+    headers = _tokens(data)
+    depth = data.config.version_depth
+
+    def make(i: int) -> Request:
+        owner = rng.choice(data.user_ids)
+        note_id = rng.choice(data.notes_by_owner[owner])
+        return Request("POST", f"/notes/{note_id}/restore/{rng.randint(1, depth)}", headers[owner])
+    return make
+
+
+# name -> (endpoint label, scenario); read-only scenarios first so writes don't skew them
+SCENARIOS: dict[str, tuple[str, Scenario]] = {
+    "auth": ("POST /auth/login", auth),
+    "list": ("GET /notes", list_notes),
+    "search": ("GET /notes/search", search),
+    "get": ("GET /notes/{id}", get),
+    "update": ("PUT /notes/{id}", update),
+    "share": ("POST /notes/{id}/share", share),
+    "restore": ("POST /notes/{id}/restore/{n}", restore),
+}
@@ -0,0 +1,132 @@
+"""Deterministic data seeder for the benchmark suite.
+
+The same ``SeedConfig`` always produces the same users, notes, version
+histories and shares, so runs before and after a change are comparable.
+"""
+import math
+import random
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from app.core.security import hash_password
+from app.crud import note as note_crud
+from app.db import search
+from app.db.base import Base
+from app.models import user, note, note_version, collaborator, activity_log  # noqa: F401
+from app.models.collaborator import CollaboratorRole, NoteCollaborator
+from app.models.note import Note
+from app.models.user import User
+
+PASSWORD = "bench-pass-1234"
+_HEADS = ("al", "be", "co", "da", "el", "fi", "go", "hu", "ir", "jo")
+_TAILS = ("ta", "ven", "rix", "mo", "lun", "spar", "dex", "qua", "nor", "zel",
+          "pim", "tor", "wex", "yal", "kip", "sor", "bran", "cle", "dru", "fen")
+VOCABULARY = [head + tail for tail in _TAILS for head in _HEADS]
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    users: int = 20
+    notes_per_user: int = 50
+    # note sizes are log-normal around content_median characters
+    content_median: int = 2000
+    content_sigma: float = 1.0
+    content_max: int = 100_000
+    version_depth: int = 5
+    share_fanout: int = 3
+    seed: int = 1234
+
+
+@dataclass
+class Dataset:
+    config: SeedConfig
+    user_ids: list[int] = field(default_factory=list)
+    emails: dict[int, str] = field(default_factory=dict)
+    notes_by_owner: dict[int, list[int]] = field(default_factory=dict)
+    # (note_id, user_id, role) for every share
+    shares: list[tuple[int, int, str]] = field(default_factory=list)
+
+    @property
+    def note_ids(self) -> list[int]:
+        return [n for ids in self.notes_by_owner.values() for n in ids]
+
+
+def _word(rng: random.Random) -> str:
+    # Zipf-like: low indexes are much more common, like real vocabulary
+    return VOCABULARY[min(int(rng.paretovariate(1.2)) - 1, len(VOCABULARY) - 1)]
+
+
+def _line(rng: random.Random) -> str:
+    return " ".join(_word(rng) for _ in range(rng.randint(5, 14))) + "\n"
+
+
+def _content(rng: random.Random, config: SeedConfig) -> list[str]:
+    size = min(config.content_max, max(20, int(rng.lognormvariate(math.log(config.content_median), config.content_sigma))))
+    lines, total = [], 0
+    while total < size:
+        lines.append(_line(rng))
+        total += len(lines[-1])
+    return lines
+
+
+def seed(engine: Engine, config: SeedConfig) -> Dataset:
+    """Recreate the schema on ``engine`` and fill it according to ``config``."""
+    rng = random.Random(config.seed)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    data = Dataset(config)
+    hashed = hash_password(PASSWORD)  # one bcrypt hash shared by every user
+
+    with Session(engine) as db:
+        users = [User(email=f"user{i}@notespace-bench.dev", hashed_password=hashed) for i in range(config.users)]
+        db.add_all(users)
+        db.flush()
+        data.user_ids = [u.id for u in users]
+        data.emails = {u.id: u.email for u in users}
+
+        for owner_id in data.user_ids:
+            notes, histories = [], []
+            for i in range(config.notes_per_user):
+                lines = _content(rng, config)
+                history = ["".join(lines)]
+                for _ in range(config.version_depth):
+                    lines[rng.randrange(len(lines))] = _line(rng)
+                    history.append("".join(lines))
+                notes.append(Note(
+                    owner_id=owner_id,
+                    title=f"{_word(rng)} {_word(rng)} {i}",
+                    content=history[-1],
+                    current_version=config.version_depth,
+                ))
+                histories.append(history)
+            db.add_all(notes)
+            db.flush()
+            data.notes_by_owner[owner_id] = [n.id for n in notes]
+
+            # version n holds the content before edit n, encoded like the app does
+            keyframes: dict = {}
+            for n, history in zip(notes, histories):
+                for number, content in enumerate(history[:-1], start=1):
+                    state = SimpleNamespace(id=n.id, title=n.title, content=content)
+                    db.add(note_crud._snapshot(db, state, number, owner_id, keyframes))
+            search.index_notes(db, [(n.id, n.title, n.content) for n in notes])
+
+            others = [u for u in data.user_ids if u != owner_id]
+            for n in notes:
+                for user_id in rng.sample(others, min(config.share_fanout, len(others))):
+                    role = CollaboratorRole.EDITOR if rng.random() < 0.3 else CollaboratorRole.VIEWER
+                    db.add(NoteCollaborator(note_id=n.id, user_id=user_id, role=role))
+                    data.shares.append((n.id, user_id, role.value))
+            db.commit()
+    return data
+
+
+def search_term(rng: random.Random) -> str:
+    return _word(rng)
+
+
+def edited_line(rng: random.Random) -> str:
+    return _line(rng)
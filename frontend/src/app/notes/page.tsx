@@ -6,11 +6,11 @@ import Link from 'next/link';
 import { api } from '@/lib/api';
 import { useAuth } from '@/contexts/AuthContext';
 import NoteCard from '@/components/NoteCard';
-import type { Note } from '@/types';
+import type { NoteSummary } from '@/types';
 
 export default function NotesPage() {
-  const [notes, setNotes] = useState<Note[]>([]);
-  const [sharedNotes, setSharedNotes] = useState<Note[]>([]);
+  const [notes, setNotes] = useState<NoteSummary[]>([]);
+  const [sharedNotes, setSharedNotes] = useState<NoteSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [searchQuery, setSearchQuery] = useState('');
@@ -1,10 +1,10 @@
 'use client';
 
 import Link from 'next/link';
-import type { Note } from '@/types';
+import type { Note, NoteSummary } from '@/types';
 
 interface NoteCardProps {
-  note: Note & { role?: string };
+  note: (Note | NoteSummary) & { role?: string };
   onDelete?: (id: number) => void;
   isShared?: boolean;
   index?: number;
@@ -54,7 +54,7 @@ export default function NoteCard({ note, onDelete, isShared, index = 0 }: NoteCa
 
       {/* Content Preview */}
       <p className="text-slate-500 text-sm leading-relaxed line-clamp-3 mb-4">
-        {note.content}
+        {'preview' in note ? note.preview : note.content}
       </p>
 
       {/* Footer */}
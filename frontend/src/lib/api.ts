@@ -2,6 +2,7 @@ import type {
   User, 
   UserCreate, 
   Note, 
+  NoteSummary,
   NoteCreate, 
   NoteUpdate, 
   Token, 
@@ -104,13 +105,14 @@ class ApiClient {
   }
 
   // Notes endpoints
-  async getNotes(search?: string): Promise<Note[]> {
-    const query = search ? `?q=${encodeURIComponent(search)}` : '';
-    return this.request<Note[]>(`/notes/${query}`);
+  // List pages only need previews, so ask for the summary view
+  async getNotes(search?: string): Promise<NoteSummary[]> {
+    const query = search ? `&q=${encodeURIComponent(search)}` : '';
+    return this.request<NoteSummary[]>(`/notes/?view=summary${query}`);
   }
 
-  async getSharedNotes(): Promise<Note[]> {
-    return this.request<Note[]>('/notes/shared');
+  async getSharedNotes(): Promise<NoteSummary[]> {
+    return this.request<NoteSummary[]>('/notes/shared?view=summary');
   }
 
   async getNote(id: number): Promise<Note> {
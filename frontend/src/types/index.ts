@@ -22,6 +22,18 @@ export interface Note {
   shared_with?: Collaborator[];
 }
 
+// List item returned with ?view=summary
+export interface NoteSummary {
+  id: number;
+  title: string;
+  preview: string;
+  content_length: number;
+  version?: number;
+  owner_id: number;
+  created_at: string;
+  updated_at: string;
+}
+
 export interface NoteCreate {
   title: string;
   content: string;
@@ -0,0 +1,17 @@
+def _token(client):
+    client.post("/auth/register", json={"email":"act@act.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"act@act.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_activity_buffered_and_views_collapsed(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+
+    note_id = client.post("/notes", json={"title":"a", "content":"b"}, headers=h).json()["id"]
+    for _ in range(3):
+        assert client.get(f"/notes/{note_id}", headers=h).status_code == 200
+    client.put(f"/notes/{note_id}", json={"content":"c"}, headers=h)
+
+    r = client.get("/users/me/activity", headers=h)
+    actions = [log["action"] for log in r.json() if log["note_id"] == note_id]
+    assert actions.count("view") == 1
+    assert sorted(actions) == ["create", "update", "view"]
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+
+from app.core.activity_retention import purge_activity
+from app.models.activity_log import ActivityLog, ActionType
+from tests.conftest import engine
+
+def _token(client):
+    client.post("/auth/register", json={"email":"stats@stats.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"stats@stats.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_stats_from_rollup_survive_retention(client, tmp_path):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    user_id = client.get("/users/me", headers=h).json()["id"]
+    note_id = client.post("/notes", json={"title":"s", "content":"counted"}, headers=h).json()["id"]
+    client.get(f"/notes/{note_id}", headers=h)
+    client.put(f"/notes/{note_id}", json={"content":"again"}, headers=h)
+    client.put(f"/notes/{note_id}", json={"content":"and again"}, headers=h)
+
+    r = client.get(f"/notes/{note_id}/stats", headers=h)
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["totals"] == {"create": 1, "view": 1, "update": 2}
+    assert stats["unique_users"] == 1
+    assert len(stats["daily"]) == 1
+
+    # age the raw rows past the cutoff; the rollup keeps the counts
+    old = datetime.now(timezone.utc) - timedelta(days=400)
+    with engine.begin() as conn:
+        conn.execute(insert(ActivityLog), [
+            {"user_id": user_id, "note_id": note_id, "action": ActionType.VIEW, "timestamp": old} for _ in range(5)
+        ])
+    archive = tmp_path / "activity.ndjson"
+    assert purge_activity(engine, timedelta(days=365), batch_size=2, archive_path=str(archive)) == 5
+    assert len(archive.read_text().splitlines()) == 5
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(ActivityLog).where(ActivityLog.note_id == note_id)) == 4
+
+    assert client.get(f"/notes/{note_id}/stats", headers=h).json()["totals"] == stats["totals"]
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.api.router import build_api_router
+from app.core.deps import get_db, get_async_db
+from tests.conftest import override_get_db
+
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+AsyncTestingSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
+@pytest.fixture()
+def async_client():
+    app = FastAPI()
+    app.include_router(build_api_router(async_db=True))
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as c:
+        yield c
+
+def test_async_note_routes(async_client):
+    client = async_client
+    client.post("/auth/register", json={"email":"aio@aio.com", "password":"pass1234"})
+    token = client.post("/auth/login", data={"username":"aio@aio.com", "password":"pass1234"}).json()["access_token"]
+    h = {"Authorization": f"Bearer {token}"}
+
+    r = client.post("/notes", json={"title":"async", "content":"first"}, headers=h)
+    assert r.status_code == 201
+    note_id = r.json()["id"]
+
+    r = client.put(f"/notes/{note_id}", json={"content":"second"}, headers=h)
+    assert r.json()["content"] == "second"
+    assert client.get(f"/notes/{note_id}", headers=h).json()["content"] == "second"
+    assert [n["id"] for n in client.get("/notes/search", params={"q": "second"}, headers=h).json()] == [note_id]
+
+    etag = client.get(f"/notes/{note_id}", headers=h).headers["ETag"]
+    assert client.get(f"/notes/{note_id}", headers={**h, "If-None-Match": etag}).status_code == 304
+    r = client.get(f"/notes/{note_id}", headers={**h, "If-None-Match": '"stale"'})
+    assert r.json()["content"] == "second"
+
+    # routes without an async version fall through to the sync router
+    r = client.get(f"/notes/{note_id}/versions", headers=h)
+    assert [v["content_snapshot"] for v in r.json()] == ["first"]
+
+    assert client.delete(f"/notes/{note_id}", headers=h).status_code == 204
+    assert client.get(f"/notes/{note_id}", headers=h).status_code == 404
+    # static sync paths aren't shadowed by the async /{note_id}
+    assert client.get("/notes/export", headers=h).status_code == 200
@@ -4,3 +4,31 @@ def test_register_and_login(client):
     r = client.post("/auth/login", data={"username":"a@a.com", "password":"pass1234"})
     assert r.status_code == 200
     assert "access_token" in r.json()
+
+def test_principal_cache_and_invalidation(client):
+    from app.core.principal import principal_cache
+    from app.models.user import User
+    from tests.conftest import TestingSessionLocal
+
+    client.post("/auth/register", json={"email":"c@c.com", "password":"pass1234"})
+    token = client.post("/auth/login", data={"username":"c@c.com", "password":"pass1234"}).json()["access_token"]
+    h = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/users/me", headers=h).json()["email"] == "c@c.com"
+    hits = principal_cache.hits
+    assert client.get("/users/me", headers=h).status_code == 200
+    assert principal_cache.hits == hits + 1
+
+    db = TestingSessionLocal()
+    db.delete(db.get(User, client.get("/users/me", headers=h).json()["id"]))
+    db.commit()
+    db.close()
+    assert client.get("/users/me", headers=h).status_code == 401
+
+def test_login_sheds_load_when_hash_queue_is_full(client, monkeypatch):
+    from app.core.security import password_hasher
+    client.post("/auth/register", json={"email":"busy@b.com", "password":"pass1234"})
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    r = client.post("/auth/login", data={"username":"busy@b.com", "password":"pass1234"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
@@ -0,0 +1,37 @@
+def _token(client, email="b@b.com"):
+    client.post("/auth/register", json={"email":email, "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":email, "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_batch_operations(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    keep = client.post("/notes", json={"title":"keep", "content":"v1"}, headers=h).json()["id"]
+    drop = client.post("/notes", json={"title":"drop", "content":"bye"}, headers=h).json()["id"]
+    other = {"Authorization": f"Bearer {_token(client, 'b2@b.com')}"}
+    foreign = client.post("/notes", json={"title":"theirs", "content":"x"}, headers=other).json()["id"]
+
+    ops = [
+        {"op":"create", "title":"new", "content":"batched note"},
+        {"op":"update", "id":keep, "content":"v2"},
+        {"op":"update", "id":keep, "title":"kept"},
+        {"op":"delete", "id":drop},
+        {"op":"update", "id":drop, "content":"too late"},
+        {"op":"delete", "id":foreign},
+    ]
+    r = client.post("/notes/batch", json={"operations":ops}, headers=h)
+    assert r.status_code == 200
+    results = r.json()
+    assert [x["status"] for x in results] == [201, 200, 200, 204, 404, 403]
+    created = results[0]["id"]
+
+    assert client.get(f"/notes/{created}", headers=h).json()["content"] == "batched note"
+    note = client.get(f"/notes/{keep}", headers=h).json()
+    assert (note["title"], note["content"]) == ("kept", "v2")
+    versions = client.get(f"/notes/{keep}/versions", headers=h).json()
+    assert [(v["version_number"], v["content_snapshot"]) for v in versions] == [(2, "v2"), (1, "v1")]
+    assert client.get(f"/notes/{drop}", headers=h).status_code == 404
+    assert client.get(f"/notes/{foreign}", headers=other).status_code == 200
+    assert [n["id"] for n in client.get("/notes/search", params={"q":"batched"}, headers=h).json()] == [created]
+
+    r = client.post("/notes/batch", json={"operations":[{"op":"create", "title":"no content"}]}, headers=h)
+    assert r.status_code == 422
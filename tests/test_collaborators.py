@@ -0,0 +1,25 @@
+def _token(client, email):
+    client.post("/auth/register", json={"email":email, "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":email, "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_access_follows_sharing_changes(client):
+    owner = {"Authorization": f"Bearer {_token(client, 'o@c.com')}"}
+    other = {"Authorization": f"Bearer {_token(client, 'x@c.com')}"}
+
+    note_id = client.post("/notes", json={"title":"shared", "content":"c"}, headers=owner).json()["id"]
+    assert client.get(f"/notes/{note_id}", headers=other).status_code == 403
+
+    r = client.post(f"/notes/{note_id}/share", json={"email":"x@c.com", "role":"viewer"}, headers=owner)
+    user_id = r.json()["user_id"]
+    assert client.get(f"/notes/{note_id}", headers=other).status_code == 200
+    assert client.put(f"/notes/{note_id}", json={"content":"d"}, headers=other).status_code == 403
+
+    client.post(f"/notes/{note_id}/share", json={"email":"x@c.com", "role":"editor"}, headers=owner)
+    assert client.put(f"/notes/{note_id}", json={"content":"d"}, headers=other).status_code == 200
+
+    client.delete(f"/notes/{note_id}/share/{user_id}", headers=owner)
+    assert client.get(f"/notes/{note_id}", headers=other).status_code == 403
+
+    client.delete(f"/notes/{note_id}", headers=owner)
+    assert client.get(f"/notes/{note_id}", headers=owner).status_code == 404
@@ -0,0 +1,49 @@
+from sqlalchemy import text
+
+from app.db.compression import RAW, ZLIB, compress_existing
+from tests.conftest import engine
+
+def _token(client):
+    client.post("/auth/register", json={"email":"zip@zip.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"zip@zip.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def _stored(note_id):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT content, content_length FROM notes WHERE id = :id"), {"id": note_id}).one()
+
+def test_large_content_is_compressed(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    body = "compressible words repeat " * 400
+    note_id = client.post("/notes", json={"title":"big", "content":body}, headers=h).json()["id"]
+    small_id = client.post("/notes", json={"title":"small", "content":"tiny"}, headers=h).json()["id"]
+
+    stored, length = _stored(note_id)
+    assert stored[:1] == ZLIB and len(stored) < len(body) // 10
+    assert length == len(body)
+    assert _stored(small_id)[0] == RAW + b"tiny"
+    assert client.get(f"/notes/{note_id}", headers=h).json()["content"] == body
+
+    edited = "é" + body
+    client.put(f"/notes/{note_id}", json={"content":edited}, headers=h)
+    assert _stored(note_id)[1] == len(edited)
+    summary = {n["id"]: n for n in client.get("/notes?view=summary", headers=h).json()}[note_id]
+    assert summary["content_length"] == len(edited)
+    assert summary["preview"] == edited[:200]
+    with engine.connect() as conn:
+        snapshot = conn.scalar(text("SELECT content_snapshot FROM note_versions WHERE note_id = :id"), {"id": note_id})
+    assert snapshot[:1] == ZLIB
+    assert client.get(f"/notes/{note_id}/versions/1", headers=h).json()["content_snapshot"] == body
+
+def test_legacy_text_rows_readable_and_converted(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    note_id = client.post("/notes", json={"title":"legacy", "content":"x"}, headers=h).json()["id"]
+    body = "stored before compression " * 100
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE notes SET content = :c WHERE id = :id"), {"c": body, "id": note_id})
+    assert client.get(f"/notes/{note_id}", headers=h).json()["content"] == body
+
+    with engine.connect() as conn:
+        assert compress_existing(conn, "notes", "content", batch_size=1) >= 1
+    assert _stored(note_id)[0][:1] == ZLIB
+    assert client.get(f"/notes/{note_id}", headers=h).json()["content"] == body
@@ -0,0 +1,27 @@
+def _token(client):
+    client.post("/auth/register", json={"email":"e@e.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"e@e.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def _revalidate(client, url, h, etag):
+    return client.get(url, headers={**h, "If-None-Match": etag})
+
+def test_conditional_get(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    note_id = client.post("/notes", json={"title":"tag", "content":"c1"}, headers=h).json()["id"]
+
+    for url in (f"/notes/{note_id}", "/notes", f"/notes/{note_id}/versions", f"/notes/{note_id}/collaborators"):
+        r = client.get(url, headers=h)
+        assert r.status_code == 200
+        r = _revalidate(client, url, h, r.headers["ETag"])
+        assert r.status_code == 304
+        assert r.content == b""
+
+    etags = {url: client.get(url, headers=h).headers["ETag"] for url in (f"/notes/{note_id}", "/notes", f"/notes/{note_id}/versions")}
+    # an edit in the same second must still change every tag
+    client.put(f"/notes/{note_id}", json={"content":"c2"}, headers=h)
+    for url, etag in etags.items():
+        r = _revalidate(client, url, h, etag)
+        assert r.status_code == 200
+        assert r.headers["ETag"] != etag
+    assert _revalidate(client, f"/notes/{note_id}", h, etags[f"/notes/{note_id}"]).json()["content"] == "c2"
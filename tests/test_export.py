@@ -0,0 +1,32 @@
+import io
+import json
+import zipfile
+
+def _token(client, email):
+    client.post("/auth/register", json={"email":email, "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":email, "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_export_ndjson_and_zip(client):
+    h = {"Authorization": f"Bearer {_token(client, 'exp@exp.com')}"}
+    _token(client, "exp2@exp.com")
+    body = "".join(f"line {i}\n" for i in range(50))
+    note_id = client.post("/notes", json={"title":"exported", "content":body}, headers=h).json()["id"]
+    for i in range(3):
+        client.put(f"/notes/{note_id}", json={"content":body + f"edit {i}\n"}, headers=h)
+    client.post(f"/notes/{note_id}/share", json={"email":"exp2@exp.com", "role":"viewer"}, headers=h)
+
+    r = client.get("/notes/export?versions=true&collaborators=true", headers=h)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in r.text.splitlines()]
+    assert [r["type"] for r in records] == ["note", "version", "version", "version", "collaborator"]
+    assert records[0]["content"] == body + "edit 2\n"
+    versions = client.get(f"/notes/{note_id}/versions", headers=h).json()
+    assert [v["content"] for v in records[1:4]] == [v["content_snapshot"] for v in reversed(versions)]
+    assert records[4]["email"] == "exp2@exp.com"
+
+    r = client.get("/notes/export?format=zip&versions=true", headers=h)
+    archive = zipfile.ZipFile(io.BytesIO(r.content))
+    assert archive.namelist() == ["notes.ndjson", "versions.ndjson"]
+    assert len(archive.read("versions.ndjson").splitlines()) == 3
@@ -0,0 +1,46 @@
+import io
+import json
+import zipfile
+
+def _token(client):
+    client.post("/auth/register", json={"email":"imp@imp.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"imp@imp.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_import_ndjson_reports_bad_lines(client, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "NOTE_IMPORT_CHUNK_SIZE", 2)
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    lines = [
+        json.dumps({"title": "imported one", "content": "first body"}),
+        "not json",
+        json.dumps({"type": "note", "title": "imported two", "content": "second body"}),
+        "",
+        json.dumps({"title": "", "content": "no title"}),
+        json.dumps({"type": "version", "note_id": 1}),
+        json.dumps({"title": "imported three", "content": "third body"}),
+    ]
+    r = client.post("/notes/import", content="\n".join(lines).encode(), headers={**h, "Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200
+    result = r.json()
+    assert (result["lines"], result["imported"], result["skipped"], result["failed"]) == (6, 3, 1, 2)
+    assert [(e["line"], e["detail"]) for e in result["errors"]] == [(2, "invalid JSON"), (5, "title: String should have at least 1 character")]
+
+    titles = {n["title"] for n in client.get("/notes", headers=h).json()}
+    assert {"imported one", "imported two", "imported three"} <= titles
+    assert [n["id"] for n in client.get("/notes/search", params={"q": "third"}, headers=h).json()]
+
+    activity = [a for a in client.get("/users/me/activity", headers=h).json() if a["action"] == "create"]
+    assert [a["details"] for a in activity] == ["Imported 3 notes"]
+
+def test_import_zip_roundtrip(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    exported = client.get("/notes/export?format=zip&versions=true", headers=h).content
+    before = len(client.get("/notes", headers=h).json())
+
+    r = client.post("/notes/import", content=exported, headers={**h, "Content-Type": "application/zip"})
+    assert r.json()["imported"] == before
+    assert len(client.get("/notes", headers=h).json()) == 2 * before
+
+    r = client.post("/notes/import", content=b"nope", headers={**h, "Content-Type": "application/zip"})
+    assert r.status_code == 400
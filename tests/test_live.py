@@ -0,0 +1,66 @@
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.config import settings
+
+def _token(client, email):
+    client.post("/auth/register", json={"email":email, "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":email, "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_live_edits_fan_out_and_persist(client, monkeypatch):
+    monkeypatch.setattr(settings, "LIVE_FLUSH_INTERVAL_SECONDS", 3600)  # only the final flush
+    owner = _token(client, "live@live.com")
+    h = {"Authorization": f"Bearer {owner}"}
+    note_id = client.post("/notes", json={"title":"live", "content":"hello"}, headers=h).json()["id"]
+    client.post(f"/notes/{note_id}/share", json={"email":"liveview@live.com", "role":"viewer"}, headers=h)
+    _token(client, "liveview@live.com")  # registered before sharing? share needs the user
+    client.post(f"/notes/{note_id}/share", json={"email":"liveview@live.com", "role":"viewer"}, headers=h)
+    viewer = _token(client, "liveview@live.com")
+
+    with client.websocket_connect(f"/ws/notes/{note_id}?token={owner}") as editor, \
+            client.websocket_connect(f"/ws/notes/{note_id}", headers={"Authorization": f"Bearer {viewer}"}) as watcher:
+        snap = editor.receive_json()
+        assert snap["type"] == "snapshot" and snap["content"] == "hello" and snap["role"] == "owner"
+        assert watcher.receive_json()["role"] == "viewer"
+
+        editor.send_json({"rev": snap["rev"], "ops": [{"op":"insert", "offset":5, "text":" world"}]})
+        for ws in (editor, watcher):
+            msg = ws.receive_json()
+            assert msg["type"] == "ops" and msg["rev"] == snap["rev"] + 1
+            assert msg["ops"][0]["text"] == " world"
+
+        editor.send_json({"rev": snap["rev"], "ops": [{"op":"insert", "offset":0, "text":"x"}]})
+        assert editor.receive_json()["type"] == "reject"  # stale revision
+        watcher.send_json({"rev": snap["rev"] + 1, "ops": [{"op":"insert", "offset":0, "text":"x"}]})
+        assert watcher.receive_json() == {"type":"reject", "rev":snap["rev"] + 1, "detail":"Edit access required"}
+        editor.send_text("not json")
+        assert editor.receive_json()["type"] == "error"
+
+    # written once when the last subscriber left, as one version
+    note = client.get(f"/notes/{note_id}", headers=h).json()
+    assert note["content"] == "hello world"
+    assert len(client.get(f"/notes/{note_id}/versions", headers=h).json()) == 1
+
+def test_live_rejects_bad_token_and_strangers(client):
+    owner = _token(client, "live2@live.com")
+    h = {"Authorization": f"Bearer {owner}"}
+    note_id = client.post("/notes", json={"title":"live", "content":"hi"}, headers=h).json()["id"]
+    stranger = _token(client, "live3@live.com")
+    for url in (f"/ws/notes/{note_id}?token=bad", f"/ws/notes/{note_id}?token={stranger}", f"/ws/notes/999999?token={owner}"):
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect(url) as ws:
+                ws.receive_json()
+
+def test_live_conflict_with_http_edit(client, monkeypatch):
+    monkeypatch.setattr(settings, "LIVE_FLUSH_INTERVAL_SECONDS", 3600)
+    owner = _token(client, "live4@live.com")
+    h = {"Authorization": f"Bearer {owner}"}
+    note_id = client.post("/notes", json={"title":"live", "content":"base"}, headers=h).json()["id"]
+    with client.websocket_connect(f"/ws/notes/{note_id}?token={owner}") as ws:
+        snap = ws.receive_json()
+        ws.send_json({"rev": snap["rev"], "ops": [{"op":"insert", "offset":4, "text":"!"}]})
+        ws.receive_json()
+        client.put(f"/notes/{note_id}", json={"content":"from http"}, headers=h)
+    # the HTTP edit wins over the unsaved live edit
+    assert client.get(f"/notes/{note_id}", headers=h).json()["content"] == "from http"
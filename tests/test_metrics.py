@@ -0,0 +1,26 @@
+from app.core import metrics
+from tests.conftest import engine
+
+def _token(client):
+    client.post("/auth/register", json={"email":"m@m.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"m@m.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_metrics_endpoint(client, monkeypatch):
+    metrics.instrument_engine(engine)
+    monkeypatch.setattr(metrics.settings, "SERVER_TIMING", True)
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    note_id = client.post("/notes", json={"title":"m", "content":"measured"}, headers=h).json()["id"]
+
+    r = client.get(f"/notes/{note_id}", headers=h)
+    assert r.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="0 queries"' not in r.headers["Server-Timing"]
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    body = r.text
+    assert 'http_requests_total{method="GET",route="/notes/{note_id}",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/notes/{note_id}",le="+Inf"}' in body
+    assert 'http_request_db_queries_count{method="GET",route="/notes/{note_id}"}' in body
+    assert "db_pool_checkout_wait_seconds" in body
+    assert "http_requests_in_flight 1" in body  # the scrape itself
@@ -0,0 +1,47 @@
+import hashlib
+
+def _token(client, email="patch@patch.com"):
+    client.post("/auth/register", json={"email":email, "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":email, "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_patch_applies_ops_and_records_version(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    note = client.post("/notes", json={"title":"p", "content":"hello world"}, headers=h).json()
+    ops = [
+        {"op":"replace", "offset":0, "length":5, "text":"Hello"},
+        {"op":"insert", "offset":11, "text":"!"},
+        {"op":"delete", "offset":5, "length":1},
+    ]
+    r = client.patch(f"/notes/{note['id']}", json={"base_version":note["current_version"], "ops":ops}, headers=h)
+    assert r.status_code == 200
+    assert r.json()["content"] == "Helloworld!"
+    assert r.json()["current_version"] == note["current_version"] + 1
+    # the old content is kept as a version, as with PUT
+    assert client.get(f"/notes/{note['id']}/versions/1", headers=h).json()["content_snapshot"] == "hello world"
+
+    base_hash = hashlib.sha256("Helloworld!".encode()).hexdigest()
+    r = client.patch(f"/notes/{note['id']}", json={"base_hash":base_hash, "title":"renamed", "ops":[{"op":"insert", "offset":5, "text":", "}]}, headers=h)
+    assert r.json()["content"] == "Hello, world!" and r.json()["title"] == "renamed"
+
+def test_patch_conflict_and_bad_ops(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    note = client.post("/notes", json={"title":"p", "content":"abc"}, headers=h).json()
+    client.put(f"/notes/{note['id']}", json={"content":"abcd"}, headers=h)
+
+    r = client.patch(f"/notes/{note['id']}", json={"base_version":note["current_version"], "ops":[{"op":"insert", "offset":0, "text":"x"}]}, headers=h)
+    assert r.status_code == 409
+    assert r.json()["detail"]["current_version"] == note["current_version"] + 1
+    r = client.patch(f"/notes/{note['id']}", json={"base_hash":"0" * 64, "ops":[{"op":"insert", "offset":0, "text":"x"}]}, headers=h)
+    assert r.status_code == 409
+    assert client.get(f"/notes/{note['id']}", headers=h).json()["content"] == "abcd"
+
+    base = note["current_version"] + 1
+    r = client.patch(f"/notes/{note['id']}", json={"base_version":base, "ops":[{"op":"delete", "offset":2, "length":5}]}, headers=h)
+    assert r.status_code == 422
+    assert client.patch(f"/notes/{note['id']}", json={"ops":[]}, headers=h).status_code == 422
+
+    viewer = {"Authorization": f"Bearer {_token(client, 'patchview@patch.com')}"}
+    client.post(f"/notes/{note['id']}/share", json={"email":"patchview@patch.com", "role":"viewer"}, headers=h)
+    r = client.patch(f"/notes/{note['id']}", json={"base_version":base, "ops":[{"op":"insert", "offset":0, "text":"x"}]}, headers=viewer)
+    assert r.status_code == 403
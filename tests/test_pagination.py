@@ -0,0 +1,43 @@
+def _token(client):
+    client.post("/auth/register", json={"email":"p@p.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"p@p.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def _collect(client, url, h, limit):
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get(url, params=params, headers=h)
+        assert r.status_code == 200
+        assert len(r.json()) <= limit
+        ids += [item["id"] for item in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+def test_keyset_pagination(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+
+    # created within the same second -> ties on updated_at are broken by id
+    created = [client.post("/notes", json={"title":f"p{i}", "content":"paged"}, headers=h).json()["id"] for i in range(7)]
+    note_id = created[0]
+    for i in range(5):
+        client.put(f"/notes/{note_id}", json={"content":f"v{i}"}, headers=h)
+
+    notes = _collect(client, "/notes", h, limit=3)
+    assert sorted(notes) == sorted(created)
+    assert len(notes) == len(set(notes))
+
+    found = _collect(client, "/notes/search?q=paged", h, limit=2)
+    assert sorted(found) == sorted(created[1:])
+
+    versions = _collect(client, f"/notes/{note_id}/versions", h, limit=2)
+    assert len(versions) == 5
+
+    activity = _collect(client, f"/notes/{note_id}/activity", h, limit=4)
+    assert len(activity) == len(set(activity)) >= 6
+
+    r = client.get("/notes", params={"cursor": "not-a-cursor"}, headers=h)
+    assert r.status_code == 400
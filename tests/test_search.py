@@ -0,0 +1,27 @@
+def _token(client):
+    client.post("/auth/register", json={"email":"s@s.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"s@s.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_search_ranked_and_synced(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+
+    a = client.post("/notes", json={"title":"Groceries", "content":"milk eggs"}, headers=h).json()["id"]
+    b = client.post("/notes", json={"title":"Recipes", "content":"pancakes need milk and groceries"}, headers=h).json()["id"]
+
+    # title matches rank above content matches; prefixes match
+    r = client.get("/notes/search", params={"q": "grocer"}, headers=h)
+    assert r.status_code == 200
+    assert [n["id"] for n in r.json()] == [a, b]
+
+    r = client.get("/notes", params={"q": "pancake"}, headers=h)
+    assert [n["id"] for n in r.json()] == [b]
+
+    # index follows updates and deletes
+    client.put(f"/notes/{b}", json={"content":"waffles"}, headers=h)
+    r = client.get("/notes/search", params={"q": "pancakes"}, headers=h)
+    assert r.json() == []
+
+    client.delete(f"/notes/{a}", headers=h)
+    r = client.get("/notes/search", params={"q": "milk"}, headers=h)
+    assert r.json() == []
@@ -0,0 +1,29 @@
+def _token(client, email="sum@sum.com"):
+    client.post("/auth/register", json={"email":email, "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":email, "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_summary_view(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    content = "lorem ipsum " * 500 + "needle in the haystack " + "dolor sit " * 500
+    note_id = client.post("/notes", json={"title":"long", "content":content}, headers=h).json()["id"]
+
+    r = client.get("/notes", params={"view":"summary"}, headers=h)
+    assert r.status_code == 200
+    [item] = r.json()
+    assert "content" not in item
+    assert item["content_length"] == len(content)
+    assert item["preview"] == content[:200]
+    assert r.headers["ETag"] != client.get("/notes", headers=h).headers["ETag"]
+
+    [hit] = client.get("/notes/search", params={"q":"needle", "view":"summary"}, headers=h).json()
+    assert hit["id"] == note_id
+    assert "needle" in hit["preview"] and len(hit["preview"]) < 300
+
+    other = {"Authorization": f"Bearer {_token(client, 'sum2@sum.com')}"}
+    client.post(f"/notes/{note_id}/share", json={"email":"sum2@sum.com", "role":"viewer"}, headers=h)
+    [shared] = client.get("/notes/shared", params={"view":"summary"}, headers=other).json()
+    assert shared["role"] == "viewer" and "content" not in shared
+
+    # full view is unchanged
+    assert client.get("/notes", headers=h).json()[0]["content"] == content
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from app.models.note_version import NoteVersion
+from tests.conftest import engine
+
+def _token(client):
+    client.post("/auth/register", json={"email":"thin@thin.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"thin@thin.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def test_compaction_thins_old_versions(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    body = "".join(f"line {i}\n" for i in range(100))
+    note_id = client.post("/notes", json={"title":"thin", "content":body}, headers=h).json()["id"]
+    for i in range(6):
+        client.put(f"/notes/{note_id}", json={"content":body + f"edit {i}\n"}, headers=h)
+    before = {v["version_number"]: v for v in client.get(f"/notes/{note_id}/versions", headers=h).json()}
+
+    # versions 1-5 land in one daily bucket three days ago; 6 stays recent
+    day = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=3)
+    with engine.begin() as conn:
+        for n in range(1, 6):
+            conn.execute(
+                update(NoteVersion)
+                .where(NoteVersion.note_id == note_id, NoteVersion.version_number == n)
+                .values(created_at=day + timedelta(minutes=n))
+            )
+
+    r = client.post(f"/notes/{note_id}/versions/compact", headers=h)
+    assert r.status_code == 200
+    # 5 is the newest of its bucket, 6 the newest overall, 1 the keyframe 5 is based on
+    assert r.json() == {"note_id": note_id, "dry_run": True, "kept": [1, 5, 6], "removed": [2, 3, 4]}
+    assert len(client.get(f"/notes/{note_id}/versions", headers=h).json()) == 6
+
+    r = client.post(f"/notes/{note_id}/versions/compact?dry_run=false", headers=h)
+    assert r.json()["removed"] == [2, 3, 4]
+    after = client.get(f"/notes/{note_id}/versions", headers=h).json()
+    assert [v["version_number"] for v in after] == [6, 5, 1]
+    for v in after:
+        assert v["content_snapshot"] == before[v["version_number"]]["content_snapshot"]
+    assert client.get(f"/notes/{note_id}/versions/3", headers=h).status_code == 404
@@ -0,0 +1,52 @@
+from app.crud.note import diff_cache
+
+def _token(client):
+    client.post("/auth/register", json={"email":"diff@diff.com", "password":"pass1234"})
+    r = client.post("/auth/login", data={"username":"diff@diff.com", "password":"pass1234"})
+    return r.json()["access_token"]
+
+def _apply(a, ops):
+    lines, out, i = a.splitlines(keepends=True), [], 0
+    for op, arg in ops:
+        if op == "=":
+            out += lines[i:i + arg]
+            i += arg
+        elif op == "-":
+            i += arg
+        else:
+            out += arg
+    return "".join(out)
+
+def test_version_diffs(client):
+    h = {"Authorization": f"Bearer {_token(client)}"}
+    v1 = "".join(f"line {i}\n" for i in range(50))
+    v2 = v1.replace("line 10\n", "line ten\n") + "appended\n"
+    note_id = client.post("/notes", json={"title":"d", "content":v1}, headers=h).json()["id"]
+    client.put(f"/notes/{note_id}", json={"content":v2}, headers=h)  # version 1 = v1
+    client.put(f"/notes/{note_id}", json={"content":"gone\n"}, headers=h)  # version 2 = v2
+
+    r = client.get(f"/notes/{note_id}/versions/1/diff/2", headers=h)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["exact"] and body["added"] == 2 and body["removed"] == 1
+    assert "unified" not in body
+    assert _apply(v1, body["ops"]) == v2
+
+    hits = diff_cache.hits
+    assert client.get(f"/notes/{note_id}/versions/1/diff/2", headers=h).json() == body
+    assert diff_cache.hits == hits + 1
+
+    text = client.get(f"/notes/{note_id}/versions/1/diff/2?format=unified", headers=h).json()["unified"]
+    assert text.startswith("--- version 1\n+++ version 2\n@@ -8,7 +8,7 @@\n")
+    assert "-line 10\n+line ten\n" in text and text.endswith("+appended\n")
+
+    current = client.get(f"/notes/{note_id}/versions/2/diff/current", headers=h).json()
+    assert current["to_version"] is None
+    assert _apply(v2, current["ops"]) == "gone\n"
+
+    # the current diff follows later edits
+    client.put(f"/notes/{note_id}", json={"content":"back\n"}, headers=h)
+    current = client.get(f"/notes/{note_id}/versions/2/diff/current", headers=h).json()
+    assert _apply(v2, current["ops"]) == "back\n"
+
+    assert client.get(f"/notes/{note_id}/versions/1/diff/99", headers=h).status_code == 404
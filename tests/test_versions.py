@@ -23,3 +23,45 @@ def test_versions_and_restore(client):
     r = client.post(f"/notes/{note_id}/restore/1", headers=h)
     assert r.status_code == 200
     assert r.json()["content"] == "c1"
+
+def test_delta_versions_reconstruct(client, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "VERSION_KEYFRAME_INTERVAL", 3)
+    token = _token(client)
+    h = {"Authorization": f"Bearer {token}"}
+
+    lines = [f"line {i}\n" for i in range(200)]
+    contents = ["".join(lines)]
+    r = client.post("/notes", json={"title":"long", "content":contents[0]}, headers=h)
+    note_id = r.json()["id"]
+
+    for i in range(7):
+        lines[i * 10] = f"edited {i}\n"
+        contents.append("".join(lines))
+        client.put(f"/notes/{note_id}", json={"content":contents[-1]}, headers=h)
+
+    # version n holds the content before edit n
+    r = client.get(f"/notes/{note_id}/versions", headers=h)
+    assert [v["content_snapshot"] for v in reversed(r.json())] == contents[:-1]
+
+    r = client.get(f"/notes/{note_id}/versions/5", headers=h)
+    assert r.json()["content_snapshot"] == contents[4]
+
+    r = client.post(f"/notes/{note_id}/restore/6", headers=h)
+    assert r.json()["content"] == contents[5]
+
+def test_version_counter(client):
+    from tests.conftest import TestingSessionLocal
+    from app.models.note import Note
+    token = _token(client)
+    h = {"Authorization": f"Bearer {token}"}
+
+    note_id = client.post("/notes", json={"title":"counted", "content":"c1"}, headers=h).json()["id"]
+    client.put(f"/notes/{note_id}", json={"content":"c2"}, headers=h)
+    client.put(f"/notes/{note_id}", json={"title":"renamed"}, headers=h)
+    client.post(f"/notes/{note_id}/restore/1", headers=h)
+
+    r = client.get(f"/notes/{note_id}/versions", headers=h)
+    assert [(v["version_number"], v["title_snapshot"]) for v in r.json()] == [(3, "renamed"), (2, "counted"), (1, "counted")]
+    with TestingSessionLocal() as db:
+        assert db.get(Note, note_id).current_version == 3